@@ -3,7 +3,10 @@ from dotenv import load_dotenv
 warnings.filterwarnings('ignore')
 load_dotenv(override=True)
 
-from langchain_groq import ChatGroq
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_registry import get_llm
 from selenium.webdriver.chrome.webdriver import WebDriver
 from langgraph.types import Command
 from langgraph.graph import StateGraph, START, END
@@ -18,7 +21,7 @@ from extractor import extract_node
 from agent_state import BrowserAgentState
 
 
-llm= ChatGroq(model="openai/gpt-oss-20b", temperature= 0)
+llm= get_llm("openai/gpt-oss-20b", temperature= 0)
 
 
 
@@ -4,7 +4,10 @@ import warnings
 from dotenv import load_dotenv
 warnings.filterwarnings('ignore')
 load_dotenv(override=True)
-from langchain_groq import ChatGroq
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_registry import get_llm
 from langchain_community.vectorstores import FAISS
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
@@ -12,7 +15,7 @@ from langchain.chains import RetrievalQA
 from langchain.schema import Document
 from langchain.prompts import PromptTemplate
 
-llm= ChatGroq(model="openai/gpt-oss-20b", temperature= 0)
+llm= get_llm("openai/gpt-oss-20b", temperature= 0)
 
 def get_llm_response(user_query: str, clean_text: str) -> dict:
     print("get llm response")
@@ -5,8 +5,12 @@ from dotenv import load_dotenv
 warnings.filterwarnings('ignore')
 load_dotenv(override=True)
 
-from langchain_groq import ChatGroq
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_registry import get_llm
 from langgraph.types import Command, interrupt
+from langgraph.config import get_stream_writer
 from langchain.schema import SystemMessage
 from langgraph.graph import StateGraph, START, END
 from langchain_core.runnables.config import RunnableConfig
@@ -17,13 +21,18 @@ from langgraph.store.base import BaseStore
 
 from agent_state import AgentState
 from summarize import generate_thread_summary_node
-from delete import select_and_trash_message, trash_message
+from delete import select_and_trash_message, trash_message, list_message_ids, fetch_previews, batch_trash_messages
 from count import get_email_count_today
 from draft import trustcall_extractor, TRUSTCALL_INSTRUCTION
-from sender import send_email, get_gmail_service
 from rag import qa_generator
+from outbox import get_outbox, idempotency_key
+from streaming import STREAM_TAG
+from contacts import ContactIndex, format_contacts, extract_contacts, upsert_contacts
+from gmail_query import build_gmail_query
+import metrics
+from ratelimit import llm_invoke
 
-llm= ChatGroq(model="openai/gpt-oss-20b", temperature= 0)
+llm= get_llm("openai/gpt-oss-20b", temperature= 0)
 
 
 # client = AzureOpenAI(
@@ -39,10 +48,18 @@ llm= ChatGroq(model="openai/gpt-oss-20b", temperature= 0)
 MEMORY_FILE = "email_memory.json"
 
 
+def memory_file_for(user_id="me"):
+    """Return the memory file for a user; the default user keeps the original file."""
+    if user_id == "me":
+        return MEMORY_FILE
+    safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", user_id)
+    return f"email_memory_{safe_id}.json"
+
+
 def load_memory(store: InMemoryStore, user_id="me"):
     """Load memory from JSON file into InMemoryStore"""
     try:
-        with open(MEMORY_FILE, "r") as f:
+        with open(memory_file_for(user_id), "r") as f:
             content = f.read().strip()
             if content:  # Only load if file is not empty
                 data = json.loads(content)
@@ -60,13 +77,13 @@ def save_memory(store: InMemoryStore, user_id="me"):
     """Save memory from InMemoryStore to JSON file"""
     memory_data = store.get(("memory", user_id), "email_book")
     if memory_data:
-        with open(MEMORY_FILE, "w") as f:
+        with open(memory_file_for(user_id), "w") as f:
             json.dump(memory_data.value, f)
             print("✅ Memory saved to file.")
 
 ##################################################################
 
-def router_node(state: AgentState) -> Command:
+def router_node(state: AgentState, config: RunnableConfig, store: BaseStore) -> Command:
     query = state.query
 
     prompt = f"""
@@ -83,36 +100,56 @@ Available nodes:
 
 Rules:
 - Always pick exactly one node.
+- For summarize_thread_node and delete_email_node, also extract the Gmail search fields
+  from the query (sender, recipient and/or subject). Use an email-id if one is given,
+  otherwise the person's name. Use null for anything not mentioned.
+- For every other node, "gmail_query" must be null.
+- "bulk" is true only for delete_email_node when the user wants every matching email
+  removed (e.g. "delete all newsletters from ..."), otherwise false.
 - Output strictly valid JSON:
   {{
-    "next_node": "<one of: summarize_thread_node, delete_email_node, reply_from_kb_node, analytics_node, send_email_node>"
+    "next_node": "<one of: summarize_thread_node, delete_email_node, reply_from_kb_node, analytics_node, send_email_node>",
+    "gmail_query": {{"from": "<sender or null>", "to": "<recipient or null>", "subject": "<subject or null>"}},
+    "bulk": <true or false>
   }}
 
 User query: "{query}"
 """
 
-    resp = llm.invoke(prompt)
+    resp = llm_invoke(llm, prompt)
     raw_output = resp.content.strip()
     try:
         parsed = json.loads(raw_output)
         next_node = parsed.get("next_node", "")
     except json.JSONDecodeError:
-        return Command(goto=END)
-    state.next_node = next_node
+        return Command(goto=END, update={"outbox_key": None})
+
+    # Same call also extracted the search fields: turn them into a Gmail "q" string
+    gmail_query = None
+    if next_node in ("summarize_thread_node", "delete_email_node"):
+        contact_index = ContactIndex.from_store(store, config["configurable"]["user_id"])
+        gmail_query = build_gmail_query(parsed.get("gmail_query"), contact_index)
+    update = {
+        "next_node": next_node,
+        "gmail_query": gmail_query,
+        "bulk": next_node == "delete_email_node" and parsed.get("bulk") is True,
+        # Only the send that queued it should show its delivery status
+        "outbox_key": None,
+    }
 
     # ---- Router logic ----
     if next_node == "summarize_thread_node":
-        return Command(goto="summary_node")
+        return Command(goto="summary_node", update=update)
     elif next_node == "delete_email_node":
-        return Command(goto="delete_node")
+        return Command(goto="delete_node", update=update)
     elif next_node == "reply_from_kb_node":
-        return Command(goto="qa_node")
+        return Command(goto="qa_node", update=update)
     elif next_node == "analytics_node":
-        return Command(goto="count_node") 
+        return Command(goto="count_node", update=update) 
     elif next_node == "send_email_node":
-        return Command(goto="draft_email_node") 
+        return Command(goto="draft_email_node", update=update) 
     else:
-        return Command(goto=END)
+        return Command(goto=END, update=update)
 
 ##################################################################
 
@@ -120,6 +157,11 @@ def get_summary_node(state: AgentState):
     query = state.query
     user_id = state.user_id
 
+    # The router already extracted the search terms in the same call
+    if state.gmail_query:
+        state.summary = generate_thread_summary_node(user_id, state.gmail_query)
+        return state
+
     prompt = """You are a structured information extraction tool designed to analyze user queries related to emails and extract exactly one piece of information from the following three categories:
 
 from: [extracted sender email-id]
@@ -140,7 +182,7 @@ Here is the user query:
     llm_prompt = prompt.format(query=query.strip())
 
     # Assume `llm.invoke` accepts a list of messages
-    response = llm.invoke([
+    response = llm_invoke(llm, [
         SystemMessage(content=llm_prompt)
     ])
 
@@ -162,12 +204,22 @@ def delete_node(state: AgentState, config: RunnableConfig, store: BaseStore):
     query=state.query
 
     """Loads email contacts from memory and drafts an email."""
+    # The router already extracted the search terms in the same call
+    if state.gmail_query:
+        state.query_dlt = state.gmail_query
+        return state
+
     user_id = config["configurable"]["user_id"]
-    namespace = ("memory", user_id)
-    existing_memory = store.get(namespace, "email_book")
+    contact_index = ContactIndex.from_store(store, user_id)
+    recipient = contact_index.unambiguous(query)
 
-    email_book = existing_memory.value.get('email_addresses', {}) if existing_memory and existing_memory.value else {}
-    formatted_email_book = json.dumps(email_book, indent=2)
+    # Fast path: an exact name or explicit address, no LLM lookup needed
+    if recipient and "subject" not in query.lower():
+        state.query_dlt = f"to:{recipient[1]}"
+        return state
+
+    # Only the contacts relevant to this query go into the prompt
+    formatted_email_book = format_contacts(contact_index.relevant_book(query))
     
     prompt = """
 You are a structured email information extraction tool.
@@ -197,7 +249,7 @@ Here is the user query:
     llm_prompt = prompt.format(query=query.strip(), formatted_email_book=formatted_email_book)
 
     # Assume `llm.invoke` accepts a list of messages
-    response = llm.invoke([
+    response = llm_invoke(llm, [
         SystemMessage(content=llm_prompt)
     ])
 
@@ -209,12 +261,43 @@ Here is the user query:
     return state
 
 
+BULK_PREVIEW_ROWS = 25
+
+
+def bulk_preview_node(state: AgentState):
+    """In bulk mode, collect every matching id but only fetch metadata for the rows shown."""
+    if not state.bulk or not state.query_dlt:
+        return state
+    print("bulk_preview_node")
+    state.bulk_message_ids = list_message_ids("me", state.query_dlt)
+    state.bulk_preview = fetch_previews("me", state.bulk_message_ids[:BULK_PREVIEW_ROWS])
+    return state
+
+
+def format_bulk_preview(previews, total):
+    """Compact one-line-per-message preview for the approval prompt."""
+    lines = [f"- {p['date'][:16]} | {p['from'][:40]} | {p['subject'][:60]}" for p in previews[:BULK_PREVIEW_ROWS]]
+    if total > len(lines):
+        lines.append(f"... and {total - len(lines)} more ({total} in total)")
+    return "\n".join(lines)
+
+
 def approval_delete_node(state: AgentState) -> Command:
     print("✋ Waiting for human approval to delete email...")
 
+    if state.bulk:
+        if not state.bulk_message_ids:
+            return Command(goto=END, update={"deleted": {"status": "not_found", "message": f"No messages found for '{state.query_dlt}'"}})
+        question = (
+            f"Do you want to delete these {len(state.bulk_message_ids)} emails?\n\n"
+            f"Query: {state.query_dlt}\n{format_bulk_preview(state.bulk_preview or [], len(state.bulk_message_ids))}\n\n(yes/no)"
+        )
+    else:
+        question = f"Do you want to delete this email?\n\nQuery: {state.query}\nCandidate: {state.deleted}\n\n(yes/no)"
+
     # Ask user explicitly
     approval = interrupt({
-        "question": f"Do you want to delete this email?\n\nQuery: {state.query}\nCandidate: {state.deleted}\n\n(yes/no)",
+        "question": question,
         "confirmation": None
     })
 
@@ -235,6 +318,16 @@ def execute_delete_node(state: AgentState):
     user_id = state.user_id
     query_dlt = state.query_dlt  # structured extracted query from delete_node
 
+    # Bulk mode: trash the approved set in batches, reporting progress to the stream
+    if state.bulk:
+        writer = get_stream_writer()
+        state.deleted = batch_trash_messages(
+            user_id,
+            state.bulk_message_ids or [],
+            on_progress=lambda done, total: writer({"progress": done / total, "label": f"Trashed {done}/{total}"})
+        )
+        return state
+
     # Step 1: find the message
     result = select_and_trash_message(user_id, query_dlt)
     if result["status"] != "found":
@@ -258,16 +351,21 @@ def count_node(state: AgentState):
 def draft_email_node(state: AgentState, config: RunnableConfig, store: BaseStore):
     """Loads email contacts from memory and drafts an email."""
     user_id = config["configurable"]["user_id"]
-    namespace = ("memory", user_id)
-    existing_memory = store.get(namespace, "email_book")
-
-    email_book = existing_memory.value.get('email_addresses', {}) if existing_memory and existing_memory.value else {}
-    formatted_email_book = json.dumps(email_book, indent=2)
+    contact_index = ContactIndex.from_store(store, user_id)
+    recipient = contact_index.unambiguous(state.query)
+
+    # Resolved locally (exact name or address): the model only drafts.
+    # Partial / fuzzy name matches are only offered to the model as candidates.
+    resolved_to = recipient[1] if recipient else None
+    if resolved_to:
+        formatted_email_book = format_contacts({recipient[0] or "recipient": resolved_to})
+    else:
+        formatted_email_book = format_contacts(contact_index.relevant_book(state.query))
 
     print("generating email draft")
     
     system_msg = f"""
-You are an intelligent email assistant with memory. The following is the user's saved email contacts:
+You are an intelligent email assistant with memory. The following are the user's saved email contacts relevant to this request:
 
 {formatted_email_book}
 
@@ -287,8 +385,8 @@ Rules for drafting emails:
     if hasattr(state, "messages") and state.messages:
         messages.extend(state.messages)
 
-    # Now invoke model with proper list of Message objects
-    response = llm.invoke(messages)
+    # Now invoke model with proper list of Message objects (tagged so the UI can stream the draft)
+    response = llm_invoke(llm, messages, config={"tags": [STREAM_TAG]})
     
     # Step 1: strip whitespace
     raw = response.content.strip()
@@ -304,13 +402,13 @@ Rules for drafting emails:
     else:
         raise ValueError(f"No JSON found in model output: {raw}")
 
-    state.to = email_objects.get("to")
+    state.to = resolved_to or email_objects.get("to")
     state.subject = email_objects.get("subject")
     state.body = email_objects.get("body")
     return state
 
 
-def approval_send_node(state: AgentState) -> Command:
+def approval_send_node(state: AgentState, config: RunnableConfig) -> Command:
     print("✋ Waiting for human approval to send email...")
 
     # Ask user explicitly
@@ -324,7 +422,10 @@ def approval_send_node(state: AgentState) -> Command:
     reject_words = {"no", "cancel", "not now"}
 
     if normalized in confirm_words:
-        return Command(goto="update_memory_node")   # proceed in pipeline
+        # The task namespace is fixed for this approval, even if the resume is replayed
+        configurable = config["configurable"]
+        key = idempotency_key(configurable.get("thread_id"), configurable.get("checkpoint_ns"))
+        return Command(goto="update_memory_node", update={"outbox_key": key})   # proceed in pipeline
     elif normalized in reject_words:
         return Command(goto=END)                   # stop without sending
     else:
@@ -339,7 +440,23 @@ def update_memory(state: AgentState, config: RunnableConfig, store: BaseStore):
     existing_profile = {"EmailContacts": existing_memory.value} if existing_memory and existing_memory.value else None
     print("memory updation")
 
-    result = trustcall_extractor.invoke({
+    # Fast path: pull name/email pairs out of the query locally
+    email_book = existing_memory.value.get('email_addresses', {}) if existing_memory and existing_memory.value else {}
+    contacts, unresolved = extract_contacts(state.query)
+    known = {email.lower() for email in email_book.values() if email}
+    ambiguous = [email for email in unresolved if email not in known]
+
+    if not ambiguous:
+        if contacts:
+            updated_book, changed = upsert_contacts(email_book, contacts)
+            if changed:
+                store.put(namespace, "email_book", {"email_addresses": updated_book})
+        metrics.incr("memory_llm_calls_avoided")
+        return state
+
+    # Addresses without a recognizable name: let trustcall work it out
+    metrics.incr("memory_llm_calls")
+    result = llm_invoke(trustcall_extractor, {
     "messages": [SystemMessage(content=TRUSTCALL_INSTRUCTION), HumanMessage(content=state.query)],
     "existing": existing_profile
     })
@@ -351,15 +468,12 @@ def update_memory(state: AgentState, config: RunnableConfig, store: BaseStore):
     return state
 
 
-def sender_node(state: AgentState):
+def sender_node(state: AgentState, config: RunnableConfig):
+    """Queues the approved email; the outbox worker sends it in the background."""
     print("sender node") 
-    gmail_service = get_gmail_service()
-
-    if gmail_service:    
-        send_email(state.to, state.subject, state.body)
-        print(f"📧 Email sent to {state.to}")
-    else:
-        state.gmail_service_warning = "⚠️ Failed to get Gmail service. Check credentials and network connection."
+    key = state.outbox_key or idempotency_key(config["configurable"].get("thread_id"))
+    state.outbox_key = get_outbox().enqueue(key, state.to, state.subject, state.body)
+    print(f"📤 Email to {state.to} queued ({key})")
     return state
 
 ##################################################################
@@ -379,30 +493,45 @@ def qa_node(state: AgentState):
     return state
 
 
-graph = StateGraph(AgentState)
-graph.add_node("router_node", router_node)
-graph.add_node("sender_node", sender_node)
-graph.add_node("approval_send_node", approval_send_node)
-graph.add_node("summary_node", get_summary_node)
-graph.add_node("qa_node", qa_node)
-graph.add_node("delete_node", delete_node)
-graph.add_node("approval_delete_node", approval_delete_node)
-graph.add_node("execute_delete_node",execute_delete_node )
-graph.add_node("count_node", count_node)
-graph.add_node("draft_email_node", draft_email_node)
-graph.add_node("update_memory_node", update_memory)
-
-graph.add_edge(START,"router_node")
-graph.add_edge("draft_email_node", "approval_send_node")
-graph.add_edge("approval_send_node", "update_memory_node")
-graph.add_edge("update_memory_node", "sender_node")
-graph.add_edge("sender_node",END)
-graph.add_edge("summary_node",END)
-graph.add_edge("qa_node",END)
-graph.add_edge("delete_node", "approval_delete_node")
-graph.add_edge("approval_delete_node", "execute_delete_node")
-graph.add_edge("execute_delete_node", END)
-graph.add_edge("count_node",END)
+NODES = {
+    "router_node": router_node,
+    "sender_node": sender_node,
+    "approval_send_node": approval_send_node,
+    "summary_node": get_summary_node,
+    "qa_node": qa_node,
+    "delete_node": delete_node,
+    "bulk_preview_node": bulk_preview_node,
+    "approval_delete_node": approval_delete_node,
+    "execute_delete_node": execute_delete_node,
+    "count_node": count_node,
+    "draft_email_node": draft_email_node,
+    "update_memory_node": update_memory,
+}
+
+
+def build_graph(overrides=None):
+    """Wire the assistant graph; overrides swaps node functions (e.g. async variants) by name."""
+    nodes = {**NODES, **(overrides or {})}
+    graph = StateGraph(AgentState)
+    for name, node in nodes.items():
+        graph.add_node(name, node)
+
+    graph.add_edge(START,"router_node")
+    graph.add_edge("draft_email_node", "approval_send_node")
+    graph.add_edge("approval_send_node", "update_memory_node")
+    graph.add_edge("update_memory_node", "sender_node")
+    graph.add_edge("sender_node",END)
+    graph.add_edge("summary_node",END)
+    graph.add_edge("qa_node",END)
+    graph.add_edge("delete_node", "bulk_preview_node")
+    graph.add_edge("bulk_preview_node", "approval_delete_node")
+    graph.add_edge("approval_delete_node", "execute_delete_node")
+    graph.add_edge("execute_delete_node", END)
+    graph.add_edge("count_node",END)
+    return graph
+
+
+graph = build_graph()
 
 across_thread_memory = InMemoryStore()
 
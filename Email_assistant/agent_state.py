@@ -31,4 +31,24 @@ class AgentState(BaseModel):
         default=None,
         description="Query to be send to send to trash function"
     )
+    bulk: Optional[bool] = Field(
+        default=False,
+        description="Delete every message matching the query instead of just one"
+    )
+    bulk_message_ids: Optional[list] = Field(
+        default=None,
+        description="Ids of the messages matched in bulk mode"
+    )
+    bulk_preview: Optional[list] = Field(
+        default=None,
+        description="Sender / subject / date of the first matches shown in the bulk approval prompt"
+    )
+    outbox_key: Optional[str] = Field(
+        default=None,
+        description="Idempotency key of the queued outbound email, used to poll delivery status"
+    )
+    gmail_query: Optional[str] = Field(
+        default=None,
+        description="Gmail search string extracted by the router for delete / summary requests"
+    )
     
\ No newline at end of file
@@ -1,6 +1,14 @@
-import streamlit as st
+import os
+import uuid
 import json
+import queue
+import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
 from langgraph.types import Command
+import metrics
+from request_cache import RequestDeduper
+from streaming import stream_graph
+from outbox import get_outbox
 from agent import (
     agent_graph,
     load_memory,
@@ -8,6 +16,9 @@ from agent import (
     across_thread_memory,
     AgentState,
 )
+from llm_registry import get_llm_stats
+
+GRAPH_WORKERS = int(os.getenv("GRAPH_WORKERS", "8"))
 
 st.set_page_config(page_title="Email Assistant", page_icon="✉️")
 
@@ -29,8 +40,43 @@ st.markdown(
 
 st.title("📧 AI Query & Email Support Assistant")
 
+# ---------- shared resources (one per process, reused by every session) ----------
+@st.cache_resource
+def get_agent_graph():
+    """Compiled graph + store are shared; sessions are isolated by thread_id/user_id."""
+    return agent_graph
+
+
+@st.cache_resource
+def get_executor():
+    """Background pool so one session's slow LLM / Gmail call doesn't block the others."""
+    return ThreadPoolExecutor(max_workers=GRAPH_WORKERS, thread_name_prefix="agent-graph")
+
+
+@st.cache_resource
+def get_deduper():
+    """Memoized graph results keyed by (session thread, submission id)."""
+    return RequestDeduper()
+
+
+@st.cache_resource
+def warm_user_memory(user_id):
+    """Load a user's email book into the shared store once per process."""
+    load_memory(across_thread_memory, user_id=user_id)
+    return True
+
+
+# Per-session identity: every browser session gets its own checkpoint thread
+if "thread_id" not in st.session_state:
+    st.session_state.thread_id = str(uuid.uuid4())
+if "user_id" not in st.session_state:
+    st.session_state.user_id = "me"
+
+st.session_state.user_id = st.sidebar.text_input("User ID", value=st.session_state.user_id) or "me"
+st.sidebar.caption(f"Session thread: {st.session_state.thread_id[:8]}")
+
 # Load memory at startup
-load_memory(across_thread_memory, user_id="me")
+warm_user_memory(st.session_state.user_id)
 
 # --- CONFIG: which nodes need explicit human approval ---
 APPROVAL_REQUIRED_NODES = {"delete_email_node", "send_email_node"}
@@ -42,9 +88,65 @@ if "last_response" not in st.session_state:
     st.session_state.last_response = None
 if "pending_action" not in st.session_state:
     st.session_state.pending_action = None
+if "submission_id" not in st.session_state:
+    st.session_state.submission_id = 0
 
 
 # ---------- helpers ----------
+def session_config():
+    """Graph config scoped to this browser session."""
+    return {"configurable": {
+        "thread_id": st.session_state.thread_id,
+        "user_id": st.session_state.user_id,
+    }}
+
+
+STREAM_LABELS = {
+    "draft_email_node": "✍️ Drafting email...",
+    "summary_node": "📝 Summarizing thread...",
+}
+
+
+def run_graph(payload):
+    """
+    Stream the graph on the shared background executor.
+
+    The worker pushes tokens into a queue; this (session) thread drains it and
+    renders drafts / summaries token-by-token until the run finishes.
+    """
+    tokens = queue.Queue()
+    future = get_executor().submit(
+        stream_graph, get_agent_graph(), payload, session_config(),
+        lambda node, text: tokens.put((node, text)),
+        lambda event: tokens.put((None, event)),
+    )
+
+    placeholder = st.empty()
+    progress_bar = None
+    streamed = ""
+    with st.spinner("Working on it..."):
+        while True:
+            try:
+                node, item = tokens.get(timeout=0.05)
+            except queue.Empty:
+                if future.done():
+                    break
+                continue
+            if isinstance(item, dict) and "progress" in item:
+                # Progress events, e.g. bulk delete batches
+                if progress_bar is None:
+                    progress_bar = st.progress(0.0)
+                progress_bar.progress(min(item["progress"], 1.0), text=item.get("label", ""))
+                continue
+            streamed += item
+            placeholder.markdown(f"{STREAM_LABELS.get(node, '')}\n\n{streamed}")
+    placeholder.empty()
+
+    response, stats = future.result()
+    st.session_state.last_stream_stats = stats
+    return response
+
+
 def safe_get(obj, key, default=None):
     """Return obj[key] if dict-like, else getattr(obj, key), else default."""
     try:
@@ -71,6 +173,7 @@ def normalize_response(raw_response, message_fallback=None):
         "reply": safe_get(raw_response, "reply"),   # <-- only reply
         "answers": safe_get(raw_response, "answers"),  # <-- KB answers always here
         "deleted": safe_get(raw_response, "deleted"),
+        "outbox_key": safe_get(raw_response, "outbox_key"),
         "message": message_val,
     }
 
@@ -110,22 +213,32 @@ def render_assistant_entry(assistant):
         if next_node == "delete_email_node":
             return "🗑️ Email deleted successfully!"
         if next_node == "send_email_node":
-            return "📧 Email sent successfully!"
+            return "📤 Email queued for delivery."
 
     # 5) fallback
     return assistant.get("message", "✅ Action completed successfully!")
 
+def new_submission():
+    """Every edit of the query box is a new submission; other reruns are not."""
+    st.session_state.submission_id += 1
+
+
 # --- User input ---
-user_input = st.text_input("Enter your email command or query:")
+user_input = st.text_input("Enter your email command or query:", on_change=new_submission)
 
 if user_input:
     state = AgentState(query=user_input)
 
-    # Run the graph
-    response = agent_graph.invoke(
-        state,
-        config={"configurable": {"thread_id": "1", "user_id": "me"}}
+    # Run the graph once per submission; Streamlit reruns reuse the memoized result
+    response, cached = get_deduper().run(
+        st.session_state.thread_id,
+        st.session_state.submission_id,
+        lambda: run_graph(state),
     )
+else:
+    response, cached = None, True
+
+if not cached:
 
     # DEBUG - remove after verification
     try:
@@ -176,10 +289,7 @@ if st.session_state.pending_action:
     col1, col2 = st.columns(2)
     with col1:
         if st.button("✅ Approve"):
-            resumed = agent_graph.invoke(
-                Command(resume="yes"),
-                config={"configurable": {"thread_id": "1", "user_id": "me"}}
-            )
+            resumed = run_graph(Command(resume="yes"))
             # normalize resumed into assistant_entry before storing
             resumed_entry = normalize_response(resumed, message_fallback="✅ Approved and executed.")
             st.success("✅ Approved and executed.")
@@ -193,10 +303,7 @@ if st.session_state.pending_action:
 
     with col2:
         if st.button("❌ Cancel"):
-            resumed = agent_graph.invoke(
-                Command(resume="no"),
-                config={"configurable": {"thread_id": "1", "user_id": "me"}}
-            )
+            resumed = run_graph(Command(resume="no"))
             cancelled_entry = normalize_response(resumed, message_fallback="❌ Cancelled.")
             st.info("❌ Cancelled.")
             st.session_state.chat_history.append({
@@ -207,6 +314,29 @@ if st.session_state.pending_action:
             st.session_state.last_response = cancelled_entry
 
 
+# --- Metrics ---
+st.sidebar.metric("Graph runs", metrics.get("graph_invocations"))
+st.sidebar.metric("Redundant runs avoided", metrics.get("graph_invocations_avoided"))
+ttft = metrics.summary("ttft_seconds")
+if ttft:
+    st.sidebar.metric("Time to first token (s)", f"{ttft['last']:.2f}", help=f"avg {ttft['avg']:.2f}s, p95 {ttft['p95']:.2f}s")
+for resource in ("gmail", "groq"):
+    throttle = metrics.summary(f"{resource}_throttle_seconds")
+    st.sidebar.caption(
+        f"{resource}: queue {metrics.get(f'{resource}_queue_depth')}, "
+        f"throttled {metrics.get(f'{resource}_throttled_calls')} calls"
+        + (f" ({throttle['avg']:.2f}s avg wait)" if throttle else "")
+    )
+
+
+with st.sidebar.expander("LLM calls"):
+    for model, stats in get_llm_stats().items():
+        st.write(
+            f"**{model}**: {stats['calls']} calls, {stats['errors']} errors, "
+            f"{stats['avg_latency']:.2f}s avg, {stats['input_tokens']}/{stats['output_tokens']} tokens in/out"
+        )
+
+
 # --- DISPLAY: show only the most recent result (clean) ---
 if not st.session_state.pending_action and st.session_state.chat_history:
     chat = st.session_state.chat_history[-1]   # latest only
@@ -245,6 +375,13 @@ if not st.session_state.pending_action and st.session_state.chat_history:
             st.success(pretty)
 
         # --- Priority 2: Email deletion results ---
+        elif isinstance(deleted, dict) and "trashed" in deleted:
+            # Bulk delete summary
+            if deleted.get("failed"):
+                st.warning(f"🗑️ {deleted.get('info')} {deleted['failed']} failed.")
+            else:
+                st.success(f"🗑️ {deleted.get('info')}")
+
         elif isinstance(deleted, dict) and deleted.get("status") == "success":
             st.success("🗑️ Email deleted successfully!")
 
@@ -278,6 +415,19 @@ else:
         st.write("Waiting for your approval to proceed (Approve / Cancel).")
     else:
         st.write("Enter a command to run (e.g., 'count emails today').")
+
+# --- Delivery status of the last queued email (sent in the background by the outbox worker) ---
+last_entry = st.session_state.chat_history[-1]["assistant"] if st.session_state.chat_history else {}
+if not st.session_state.pending_action and last_entry.get("outbox_key"):
+    delivery = get_outbox().status(last_entry["outbox_key"])
+    if delivery:
+        if delivery["status"] == "sent":
+            st.success(f"📧 Delivered to {delivery['recipient']}")
+        elif delivery["status"] == "failed":
+            st.error(f"❌ Delivery failed after {delivery['attempts']} attempts: {delivery['last_error']}")
+        else:
+            st.info(f"📤 Delivery status: {delivery['status']} (attempt {delivery['attempts']})")
+            st.button("🔄 Refresh delivery status")
         
 if __name__ == "__main__":
-    save_memory(across_thread_memory, user_id="me")
+    save_memory(across_thread_memory, user_id=st.session_state.user_id)
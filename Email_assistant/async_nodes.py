@@ -0,0 +1,168 @@
+import asyncio
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_registry import get_llm
+from langgraph.config import get_stream_writer
+
+from agent_state import AgentState
+from gmail_async import get_async_gmail_client
+from summarize import build_thread_prompt
+from count import get_today_date_query
+from delete import PREVIEW_HEADERS
+from streaming import STREAM_TAG
+from ratelimit import llm_ainvoke
+from agent import (
+    BULK_PREVIEW_ROWS,
+    build_graph,
+    get_summary_node,
+    across_thread_memory,
+    within_thread_memory,
+)
+
+# -----------------------------
+# Async node variants: Gmail I/O goes through the shared AsyncGmailClient so
+# independent fetches inside one request run concurrently, and many sessions
+# can share one event loop via async_agent_graph.ainvoke / astream.
+# -----------------------------
+GMAIL_CONCURRENCY = 10   # in-flight Gmail requests per node
+
+
+async def gather_limited(coros, limit=GMAIL_CONCURRENCY):
+    """asyncio.gather with at most `limit` coroutines running at once."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(run(c) for c in coros), return_exceptions=True)
+
+
+async def generate_thread_summary_async(user_id, query):
+    """Async counterpart of summarize.generate_thread_summary_node."""
+    client = get_async_gmail_client()
+    response = await client.list_threads("me", q=query, max_results=1)
+    threads = response.get("threads", [])
+    if not threads:
+        return {
+            "status": "error",
+            "message": "No thread found for the given query."
+        }
+
+    thread = await client.get_thread(threads[0]["id"], "me")
+    first_metadata, prompt = build_thread_prompt(thread)
+    llm = get_llm("gemma2-9b-it", temperature=0)
+    result = await llm_ainvoke(llm, [{"role": "user", "content": prompt}], config={"tags": [STREAM_TAG]})
+
+    return {
+        "status": "success",
+        "sender": first_metadata['from'],
+        "recipient": first_metadata['to'],
+        "summary": result.content.strip()
+    }
+
+
+async def get_summary_node_async(state: AgentState):
+    if not state.gmail_query:
+        # Router could not extract search terms: fall back to the sync extraction path
+        return await asyncio.to_thread(get_summary_node, state)
+    state.summary = await generate_thread_summary_async(state.user_id, state.gmail_query)
+    return state
+
+
+async def count_node_async(state: AgentState):
+    print("count_node")
+    client = get_async_gmail_client()
+    try:
+        message_ids = await client.list_message_ids("me", q=get_today_date_query() + " in:inbox")
+        state.count = len(message_ids)
+    except Exception as error:
+        print(f"An error occurred: {error}")
+        state.count = 0
+    return state
+
+
+async def bulk_preview_node_async(state: AgentState):
+    """Bulk preview with the metadata fetches for the displayed rows issued concurrently."""
+    if not state.bulk or not state.query_dlt:
+        return state
+    print("bulk_preview_node")
+    client = get_async_gmail_client()
+    state.bulk_message_ids = await client.list_message_ids("me", q=state.query_dlt)
+    shown = state.bulk_message_ids[:BULK_PREVIEW_ROWS]
+    messages = await gather_limited(
+        client.get_message(m, "me", format="metadata", metadata_headers=PREVIEW_HEADERS)
+        for m in shown
+    )
+
+    previews = []
+    for message_id, message in zip(shown, messages):
+        if isinstance(message, Exception):
+            previews.append({"id": message_id, "from": "?", "subject": f"(error: {message})", "date": ""})
+            continue
+        headers = {h["name"].lower(): h["value"] for h in message.get("payload", {}).get("headers", [])}
+        previews.append({
+            "id": message_id,
+            "from": headers.get("from", "Unknown sender"),
+            "subject": headers.get("subject", "(no subject)"),
+            "date": headers.get("date", ""),
+        })
+    state.bulk_preview = previews
+    return state
+
+
+async def execute_delete_node_async(state: AgentState):
+    print("✅ Executing delete after approval...")
+    client = get_async_gmail_client()
+
+    if state.bulk:
+        writer = get_stream_writer()
+        message_ids = state.bulk_message_ids or []
+        total, done, failed = len(message_ids), 0, []
+
+        async def trash(message_id):
+            nonlocal done
+            try:
+                await client.trash_message(message_id, "me")
+            except Exception:
+                failed.append(message_id)
+            done += 1
+            writer({"progress": done / total, "label": f"Trashed {done}/{total}"})
+
+        await gather_limited(trash(m) for m in message_ids)
+        state.deleted = {
+            "status": "success" if not failed else ("error" if len(failed) == total else "partial"),
+            "trashed": total - len(failed),
+            "failed": len(failed),
+            "failed_ids": failed,
+            "info": f"{total - len(failed)} of {total} messages moved to trash.",
+        }
+        return state
+
+    try:
+        response = await client.list_messages("me", q=state.query_dlt, max_results=1)
+        messages = response.get("messages", [])
+        if not messages:
+            state.deleted = {"status": "not_found", "message": f"No messages found for '{state.query_dlt}'"}
+            return state
+        message_id = messages[0]["id"]
+        await client.trash_message(message_id, "me")
+        state.deleted = {"status": "success", "message_id": message_id, "info": "Message moved to trash."}
+    except Exception as e:
+        state.deleted = {"status": "error", "message": str(e)}
+    return state
+
+
+ASYNC_NODES = {
+    "summary_node": get_summary_node_async,
+    "count_node": count_node_async,
+    "bulk_preview_node": bulk_preview_node_async,
+    "execute_delete_node": execute_delete_node_async,
+}
+
+# Same wiring, checkpointer and store as agent_graph; run with ainvoke / astream
+async_agent_graph = build_graph(ASYNC_NODES).compile(
+    checkpointer=within_thread_memory,
+    store=across_thread_memory
+)
@@ -0,0 +1,220 @@
+import re
+import json
+import difflib
+
+# -----------------------------
+# Contact book index: resolves recipients locally so prompts only carry
+# the few contacts that matter instead of the whole email book.
+# -----------------------------
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+WORD_RE = re.compile(r"[A-Za-z][A-Za-z'-]*")
+
+# Words that should never fuzzy-match a contact name
+STOPWORDS = {
+    "send", "email", "mail", "emails", "delete", "remove", "trash", "draft", "write",
+    "reply", "about", "regarding", "meeting", "tomorrow", "today", "summary", "thread",
+    "please", "could", "would", "there", "their", "which", "where", "with", "from",
+    "that", "this", "have", "been", "subject", "follow", "sent", "message",
+}
+FUZZY_CUTOFF = 0.85
+
+
+def normalize_email(email):
+    """Lower-case an address and strip mailto:, angle brackets and trailing punctuation."""
+    email = (email or "").strip().strip("<>").strip(".,;:")
+    if email.lower().startswith("mailto:"):
+        email = email[len("mailto:"):]
+    return email.lower()
+
+
+def normalize_name(name):
+    """Case-fold a contact name and collapse whitespace."""
+    return " ".join((name or "").casefold().split())
+
+
+class ContactIndex:
+    """Exact + fuzzy name lookup over the user's email book."""
+
+    def __init__(self, email_book):
+        self.by_name = {}     # normalized name -> (display name, email)
+        self.by_token = {}    # single name token -> set of normalized names
+        self.by_email = {}    # normalized email -> display name
+        for name, email in (email_book or {}).items():
+            if not email:
+                continue
+            key = normalize_name(name)
+            self.by_name[key] = (name, normalize_email(email))
+            self.by_email[normalize_email(email)] = name
+            for token in key.split():
+                self.by_token.setdefault(token, set()).add(key)
+
+    @classmethod
+    def from_store(cls, store, user_id):
+        """Build the index from the "email_book" entry in the store."""
+        existing_memory = store.get(("memory", user_id), "email_book")
+        email_book = existing_memory.value.get("email_addresses", {}) if existing_memory and existing_memory.value else {}
+        return cls(email_book)
+
+    def lookup(self, name):
+        """
+        Return (how, [(name, email)]) for a name: an "exact" full-name match,
+        then contacts sharing a name "token", then "fuzzy" (difflib) matches.
+        """
+        key = normalize_name(name)
+        if key in self.by_name:
+            return "exact", [self.by_name[key]]
+        if key in self.by_token:
+            return "token", [self.by_name[k] for k in sorted(self.by_token[key])]
+        close = difflib.get_close_matches(key, list(self.by_name) + list(self.by_token), n=3, cutoff=FUZZY_CUTOFF)
+        found = []
+        for match in close:
+            for k in sorted(self.by_token.get(match, {match})):
+                if self.by_name[k] not in found:
+                    found.append(self.by_name[k])
+        return "fuzzy", found
+
+    def resolve(self, query):
+        """
+        Find the recipients a query refers to.
+
+        Explicit email addresses in the query win (they overwrite memory);
+        otherwise words in the query are matched against contact names.
+
+        Returns:
+            list of (name, email, how) candidates without duplicates, where how
+            is "address", "exact", "token" or "fuzzy".
+        """
+        emails = []
+        for email in EMAIL_RE.findall(query or ""):
+            email = normalize_email(email)
+            if email not in emails:
+                emails.append(email)
+        if emails:
+            return [(self.by_email.get(email, ""), email, "address") for email in emails]
+
+        words = WORD_RE.findall(query or "")
+        candidates, seen = [], set()
+        # Two-word names first ("John Smith"), then single words
+        for size in (2, 1):
+            for i in range(len(words) - size + 1):
+                phrase = " ".join(words[i:i + size])
+                key = normalize_name(phrase)
+                if size == 1 and (len(key) < 3 or key in STOPWORDS):
+                    continue
+                if size == 2 and key not in self.by_name:
+                    continue
+                how, contacts = self.lookup(phrase)
+                for contact in contacts:
+                    if contact not in seen:
+                        seen.add(contact)
+                        candidates.append((*contact, how))
+            if candidates:
+                break
+        return candidates
+
+    def unambiguous(self, query):
+        """
+        (name, email) when the query names exactly one recipient by full name or
+        explicit address; None otherwise (token / fuzzy guesses go to the LLM).
+        """
+        candidates = self.resolve(query)
+        if len(candidates) == 1 and candidates[0][2] in ("address", "exact"):
+            return candidates[0][:2]
+        return None
+
+    def relevant_book(self, query, limit=5):
+        """The subset of the email book worth putting in a prompt for this query."""
+        return {name: email for name, email, _ in self.resolve(query)[:limit] if name}
+
+
+def format_contacts(contacts):
+    """Serialize a (small) contact dict for a prompt."""
+    return json.dumps(contacts, indent=2)
+
+
+# -----------------------------
+# Local contact extraction (fast path before the trustcall extractor)
+# -----------------------------
+_EMAIL = r"([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})"
+_NAME = r"([A-Z][A-Za-z'-]+(?:\s+[A-Z][A-Za-z'-]+)?)"
+_EMAIL_WORD = r"(?:e-?mail|mail)(?:\s+(?:id|address))?"
+
+# Patterns that pair a name with an address directly
+NAME_EMAIL_PATTERNS = [
+    re.compile(_NAME + r"'s\s+(?:new\s+)?" + _EMAIL_WORD + r"\s+is\s+" + _EMAIL),                    # Alice's email is a@b.com
+    re.compile(_EMAIL_WORD + r"\s+(?:of|for)\s+" + _NAME + r"\s+is\s+" + _EMAIL, re.IGNORECASE),      # email of Alice is a@b.com
+    re.compile(_NAME + r"\s*[<(]\s*" + _EMAIL + r"\s*[>)]"),                                          # Alice <a@b.com>
+    re.compile(r"\bto\s+" + _NAME + r"\s+at\s+" + _EMAIL),                                            # to Alice at a@b.com
+]
+# "... email to Alice ... His email id is a@b.com"
+PRONOUN_EMAIL_RE = re.compile(r"\b(?:his|her|their)\s+(?:new\s+)?" + _EMAIL_WORD + r"\s+is\s+" + _EMAIL, re.IGNORECASE)
+RECIPIENT_NAME_RE = re.compile(r"\b(?:e-?mail|mail|message|note|write|reply)\s+to\s+" + _NAME)
+
+# Capitalised words _NAME can pick up that are never part of a name
+# ("Forward Alice <a@b.com>", "Email Alice's email is ...")
+NON_NAME_WORDS = STOPWORDS | {
+    "forward", "fwd", "tell", "ask", "cc", "bcc", "contact", "ping", "notify", "share",
+    "add", "save", "update", "change", "set", "use", "dear", "hi", "hello", "hey",
+    "and", "or", "the", "to", "for", "new", "my", "our", "his", "her", "pls", "kindly",
+}
+
+
+def clean_name(name):
+    """Drop leading / trailing non-name words from a captured name ('' if nothing is left)."""
+    words = name.split()
+    while words and words[0].casefold() in NON_NAME_WORDS:
+        words.pop(0)
+    while words and words[-1].casefold() in NON_NAME_WORDS:
+        words.pop()
+    return " ".join(words)
+
+
+def extract_contacts(query):
+    """
+    Deterministically extract name/email pairs from a query.
+
+    Returns:
+        (contacts, unresolved): contacts maps name -> normalized email;
+        unresolved lists addresses that appear without a recognizable name.
+    """
+    query = query or ""
+    contacts = {}
+    for pattern in NAME_EMAIL_PATTERNS:
+        for name, email in pattern.findall(query):
+            name = clean_name(name)
+            # Only a verb / filler word was captured: leave the address unresolved
+            if name:
+                contacts[name] = normalize_email(email)
+
+    pronoun_emails = PRONOUN_EMAIL_RE.findall(query)
+    recipients = [name for name in map(clean_name, RECIPIENT_NAME_RE.findall(query)) if name]
+    if pronoun_emails and len(recipients) == 1 and len(set(pronoun_emails)) == 1:
+        contacts[recipients[0]] = normalize_email(pronoun_emails[0])
+
+    named = set(contacts.values())
+    unresolved = []
+    for email in EMAIL_RE.findall(query):
+        email = normalize_email(email)
+        if email not in named and email not in unresolved:
+            unresolved.append(email)
+    return contacts, unresolved
+
+
+def upsert_contacts(email_book, contacts):
+    """
+    Merge extracted contacts into an email book, overwriting the address of an
+    existing contact (matched case-insensitively) instead of adding a duplicate.
+
+    Returns:
+        (updated email book, changed flag)
+    """
+    updated = dict(email_book or {})
+    keys = {normalize_name(name): name for name in updated}
+    changed = False
+    for name, email in contacts.items():
+        key = keys.get(normalize_name(name), name)
+        if updated.get(key) != email:
+            updated[key] = email
+            keys[normalize_name(key)] = key
+            changed = True
+    return updated, changed
@@ -1,5 +1,6 @@
 import datetime
 from sender import get_gmail_service
+from ratelimit import gmail_execute
 import datetime
 from googleapiclient.discovery import build
 
@@ -23,11 +24,11 @@ def get_email_count_today():
     try:
         while True:
             # Make the API call, optionally including the page token
-            results = service.users().messages().list(
+            results = gmail_execute(service.users().messages().list(
                 userId='me',
                 q=query,
                 pageToken=next_page_token
-            ).execute()
+            ), "messages.list")
             
             messages = results.get('messages', [])
             total_messages += len(messages)
@@ -4,6 +4,7 @@ import datetime
 # ... (imports from previous example)
 from bs4 import BeautifulSoup
 from sender import get_gmail_service
+from ratelimit import gmail_execute, scheduler, GMAIL_QUOTA_UNITS
 
 
 def select_and_trash_message(user_id, search_query):
@@ -12,11 +13,11 @@ def select_and_trash_message(user_id, search_query):
     """
     service = get_gmail_service()
     try:
-        response = service.users().messages().list(
+        response = gmail_execute(service.users().messages().list(
             userId=user_id,
             q=search_query,
             maxResults=1
-        ).execute()
+        ), "messages.list")
 
         messages = response.get('messages', [])
         if not messages:
@@ -33,10 +34,130 @@ def select_and_trash_message(user_id, search_query):
 def trash_message(user_id, message_id):
     service = get_gmail_service()
     try:
-        service.users().messages().trash(userId=user_id, id=message_id).execute()
+        gmail_execute(service.users().messages().trash(userId=user_id, id=message_id), "messages.trash")
         return {"status": "success", "message_id": message_id, "info": "Message moved to trash."}
     except Exception as e:
         return {"status": "error", "message": str(e)}
+
+
+# -----------------------------
+# Bulk mode: page through every match, preview, trash in batches
+# -----------------------------
+BATCH_SIZE = 50          # Gmail recommends <= 50 calls per batch request
+PREVIEW_HEADERS = ["From", "Subject", "Date"]
+
+
+def list_message_ids(user_id, search_query, limit=None):
+    """
+    Returns the ids of all messages matching a search query, following nextPageToken.
+    """
+    service = get_gmail_service()
+    message_ids = []
+    page_token = None
+    while True:
+        response = gmail_execute(service.users().messages().list(
+            userId=user_id,
+            q=search_query,
+            maxResults=500,
+            pageToken=page_token
+        ), "messages.list")
+        message_ids.extend(m["id"] for m in response.get("messages", []))
+        page_token = response.get("nextPageToken")
+        if not page_token or (limit and len(message_ids) >= limit):
+            break
+    return message_ids[:limit] if limit else message_ids
+
+
+def fetch_previews(user_id, message_ids):
+    """
+    Fetches sender / subject / date for many messages with metadata-only,
+    batched requests (no bodies are downloaded).
+    """
+    service = get_gmail_service()
+    previews = {}
+
+    def on_response(request_id, response, exception):
+        if exception is not None:
+            previews[request_id] = {"id": request_id, "from": "?", "subject": f"(error: {exception})", "date": ""}
+            return
+        headers = {h["name"].lower(): h["value"] for h in response.get("payload", {}).get("headers", [])}
+        previews[request_id] = {
+            "id": request_id,
+            "from": headers.get("from", "Unknown sender"),
+            "subject": headers.get("subject", "(no subject)"),
+            "date": headers.get("date", ""),
+        }
+
+    for start in range(0, len(message_ids), BATCH_SIZE):
+        chunk = message_ids[start:start + BATCH_SIZE]
+        batch = service.new_batch_http_request(callback=on_response)
+        for message_id in chunk:
+            batch.add(
+                service.users().messages().get(
+                    userId=user_id, id=message_id, format="metadata", metadataHeaders=PREVIEW_HEADERS
+                ),
+                request_id=message_id
+            )
+        # A batch is billed per inner call
+        gmail_execute(batch, "messages.get", cost=len(chunk) * GMAIL_QUOTA_UNITS["messages.get"])
+
+    return [previews[m] for m in message_ids if m in previews]
+
+
+def batch_trash_messages(user_id, message_ids, on_progress=None):
+    """
+    Moves many messages to trash using batched requests. Requests rate-limited
+    inside a batch pause the Gmail bucket and are retried in a later batch;
+    they only count as failed once their retries run out.
+
+    Args:
+        on_progress: optional callable(done, total) called after each batch.
+
+    Returns:
+        dict with status, trashed / failed counts and the failed ids.
+    """
+    service = get_gmail_service()
+    failed = []
+    attempts = {}
+    rate_limited = []
+
+    def on_response(request_id, response, exception):
+        if exception is None:
+            return
+        # Blocks the shared Gmail bucket, so the next batch waits out the back-off
+        if scheduler.honour_retry_after("gmail", exception, attempts.get(request_id, 0)) is not None:
+            attempts[request_id] = attempts.get(request_id, 0) + 1
+            rate_limited.append(request_id)
+        else:
+            failed.append(request_id)
+
+    total = len(message_ids)
+    pending = list(message_ids)
+    done = 0
+    while pending:
+        chunk, pending = pending[:BATCH_SIZE], pending[BATCH_SIZE:]
+        rate_limited.clear()
+        batch = service.new_batch_http_request(callback=on_response)
+        for message_id in chunk:
+            batch.add(service.users().messages().trash(userId=user_id, id=message_id), request_id=message_id)
+        try:
+            gmail_execute(batch, "messages.trash", cost=len(chunk) * GMAIL_QUOTA_UNITS["messages.trash"])
+        except Exception as e:
+            print(f"Batch trash failed: {e}")
+            failed.extend(m for m in chunk if m not in failed)
+            rate_limited.clear()
+        pending.extend(rate_limited)
+        done += len(chunk) - len(rate_limited)
+        if on_progress:
+            on_progress(done, total)
+
+    return {
+        "status": "success" if not failed else ("error" if len(failed) == total else "partial"),
+        "trashed": total - len(failed),
+        "failed": len(failed),
+        "failed_ids": failed,
+        "info": f"{total - len(failed)} of {total} messages moved to trash.",
+    }
     
 if __name__ == '__main__':
     user_id = 'me'
@@ -4,7 +4,10 @@ from langchain_core.messages import AnyMessage
 import json
 import re
 from pydantic import BaseModel, Field
-from langchain_groq import ChatGroq
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_registry import get_llm
 from langchain_core.runnables.config import RunnableConfig
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.store.memory import InMemoryStore
@@ -14,14 +17,13 @@ from langgraph.store.base import BaseStore
 from trustcall import create_extractor
 from typing import Optional
 from agent_state import AgentState
-from langchain_groq import ChatGroq
 import warnings
 from dotenv import load_dotenv
 warnings.filterwarnings('ignore')
 load_dotenv(override=True)
 
 # Initialize the model (using Groq instead of OpenAI as in your original code)
-model = ChatGroq(model="openai/gpt-oss-20b", temperature=0)
+model = get_llm("openai/gpt-oss-20b", temperature=0)
 
 # Define the schema for storing email addresses
 class EmailContacts(BaseModel):
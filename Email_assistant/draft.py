@@ -1,5 +1,8 @@
 from pydantic import BaseModel, Field
-from langchain_groq import ChatGroq
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_registry import get_llm
 from trustcall import create_extractor
 import warnings
 from dotenv import load_dotenv
@@ -7,7 +10,7 @@ warnings.filterwarnings('ignore')
 load_dotenv(override=True)
 
 # Initialize the model (using Groq instead of OpenAI as in your original code)
-model = ChatGroq(model="openai/gpt-oss-20b", temperature=0)
+model = get_llm("openai/gpt-oss-20b", temperature=0)
 
 # Define the schema for storing email addresses
 class EmailContacts(BaseModel):
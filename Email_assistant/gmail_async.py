@@ -0,0 +1,168 @@
+import os
+import time
+import random
+import asyncio
+import weakref
+import httpx
+import warnings
+from dotenv import load_dotenv
+from ratelimit import scheduler
+warnings.filterwarnings('ignore')
+load_dotenv(override=True)
+
+# -----------------------------
+# asyncio Gmail client: pooled httpx connections, token refresh,
+# retries with jittered backoff on 429 / 5xx
+# -----------------------------
+GMAIL_API = "https://gmail.googleapis.com/gmail/v1/users"
+TOKEN_URI = "https://oauth2.googleapis.com/token"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE"}
+
+CLIENT_ID = os.getenv("CLIENT_ID")
+CLIENT_SECRET = os.getenv("CLIENT_SECRET")
+REFRESH_TOKEN = os.getenv("REFRESH_TOKEN")
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0):
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def retry_after_seconds(response):
+    """Seconds from a Retry-After header (delta-seconds form), or None."""
+    value = response.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class AsyncGmailClient:
+    """Minimal async wrapper over the Gmail REST API used by the email assistant."""
+
+    def __init__(self, client_id=None, client_secret=None, refresh_token=None,
+                 max_retries=5, max_connections=100, http_client=None):
+        self.client_id = client_id or CLIENT_ID
+        self.client_secret = client_secret or CLIENT_SECRET
+        self.refresh_token = refresh_token or REFRESH_TOKEN
+        self.max_retries = max_retries
+        self._http = http_client or httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=20),
+        )
+        self._token = None
+        self._token_expiry = 0.0
+        self._token_lock = asyncio.Lock()
+
+    async def _access_token(self, force=False):
+        """Return a valid access token, refreshing it (once, for all waiters) when needed."""
+        async with self._token_lock:
+            if not force and self._token and time.time() < self._token_expiry - 60:
+                return self._token
+            response = await self._http.post(TOKEN_URI, data={
+                "grant_type": "refresh_token",
+                "refresh_token": self.refresh_token,
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+            })
+            response.raise_for_status()
+            payload = response.json()
+            self._token = payload["access_token"]
+            self._token_expiry = time.time() + payload.get("expires_in", 3600)
+            return self._token
+
+    async def request(self, method, path, user_id="me", quota_method=None, idempotent=None, **kwargs):
+        """
+        Call users/{user_id}/{path}. A 401 refreshes the token once without using
+        up a retry; 429 is retried with backoff, and 5xx / transport errors are
+        retried only for idempotent calls (a resent POST could act twice).
+        Raises once retries are exhausted.
+        """
+        url = f"{GMAIL_API}/{user_id}/{path}"
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        refreshed = False
+        attempt = 0
+        while True:
+            await scheduler.aacquire("gmail", quota_method)
+            token = await self._access_token()
+            try:
+                response = await self._http.request(
+                    method, url, headers={"Authorization": f"Bearer {token}"}, **kwargs
+                )
+            except httpx.TransportError:
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code == 401 and not refreshed:
+                refreshed = True
+                await self._access_token(force=True)
+                continue
+            retryable = response.status_code == 429 or (idempotent and response.status_code in RETRY_STATUSES)
+            if retryable and attempt < self.max_retries:
+                delay = retry_after_seconds(response)
+                delay = delay if delay is not None else backoff_delay(attempt)
+                if response.status_code == 429:
+                    # Pause every Gmail caller, not just this one
+                    scheduler.buckets["gmail"].block_for(delay)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            response.raise_for_status()
+            return response.json() if response.content else {}
+
+    # ---- messages ----
+    async def list_messages(self, user_id="me", q=None, max_results=None, page_token=None):
+        params = {k: v for k, v in {"q": q, "maxResults": max_results, "pageToken": page_token}.items() if v}
+        return await self.request("GET", "messages", user_id, quota_method="messages.list", params=params)
+
+    async def list_message_ids(self, user_id="me", q=None, limit=None):
+        """All message ids for a query, following nextPageToken."""
+        message_ids, page_token = [], None
+        while True:
+            response = await self.list_messages(user_id, q=q, max_results=500, page_token=page_token)
+            message_ids.extend(m["id"] for m in response.get("messages", []))
+            page_token = response.get("nextPageToken")
+            if not page_token or (limit and len(message_ids) >= limit):
+                break
+        return message_ids[:limit] if limit else message_ids
+
+    async def get_message(self, message_id, user_id="me", format="full", metadata_headers=None):
+        params = [("format", format)] + [("metadataHeaders", h) for h in (metadata_headers or [])]
+        return await self.request("GET", f"messages/{message_id}", user_id, quota_method="messages.get", params=params)
+
+    async def trash_message(self, message_id, user_id="me"):
+        # Trashing an already-trashed message is a no-op, so this POST is safe to retry
+        return await self.request("POST", f"messages/{message_id}/trash", user_id, quota_method="messages.trash", idempotent=True)
+
+    async def send_message(self, raw_message, user_id="me"):
+        return await self.request("POST", "messages/send", user_id, quota_method="messages.send", json=raw_message)
+
+    # ---- threads ----
+    async def list_threads(self, user_id="me", q=None, max_results=None):
+        params = {k: v for k, v in {"q": q, "maxResults": max_results}.items() if v}
+        return await self.request("GET", "threads", user_id, quota_method="threads.list", params=params)
+
+    async def get_thread(self, thread_id, user_id="me"):
+        return await self.request("GET", f"threads/{thread_id}", user_id, quota_method="threads.get")
+
+    async def aclose(self):
+        await self._http.aclose()
+
+
+# One client (and connection pool) per event loop
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_gmail_client():
+    """Shared AsyncGmailClient for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = AsyncGmailClient()
+    return client
@@ -0,0 +1,57 @@
+import re
+
+from contacts import EMAIL_RE, normalize_email
+
+# -----------------------------
+# Translate extracted search fields into a validated Gmail "q" string
+# -----------------------------
+SEARCH_FIELDS = ("from", "to", "subject")
+_EMPTY = {"", "null", "none", "n/a", "unknown"}
+
+
+def _clean(value):
+    value = str(value or "").strip().strip("[]").strip()
+    return "" if value.lower() in _EMPTY else value
+
+
+def _address_term(field, value, contact_index=None):
+    """from:/to: term for an email address or a contact name."""
+    match = EMAIL_RE.search(value)
+    if match:
+        return f"{field}:{normalize_email(match.group())}"
+    if contact_index is not None:
+        how, found = contact_index.lookup(value)
+        # Only a full-name match is trusted; partial / fuzzy names search by display name
+        if how == "exact" and len(found) == 1:
+            return f"{field}:{found[0][1]}"
+    # Gmail also matches display names, quote them so multi-word names stay together
+    name = re.sub(r'["()]', "", value).strip()
+    return f'{field}:"{name}"' if name else None
+
+
+def build_gmail_query(fields, contact_index=None):
+    """
+    Build a Gmail search string from {"from": ..., "to": ..., "subject": ...}.
+
+    Names are resolved through the contact index when possible; unknown values
+    and empty placeholders are dropped.
+
+    Returns:
+        str or None if no usable field was extracted.
+    """
+    if not isinstance(fields, dict):
+        return None
+
+    terms = []
+    for field in SEARCH_FIELDS:
+        value = _clean(fields.get(field))
+        if not value:
+            continue
+        if field == "subject":
+            subject = re.sub(r'["()]', "", value).strip()
+            term = f'subject:"{subject}"' if subject else None
+        else:
+            term = _address_term(field, value, contact_index)
+        if term:
+            terms.append(term)
+    return " ".join(terms) or None
@@ -0,0 +1,48 @@
+import threading
+from collections import defaultdict, deque
+
+# -----------------------------
+# Process-wide counters and timings shared by the graph, the nodes and the UI
+# -----------------------------
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_observations = defaultdict(lambda: deque(maxlen=500))
+
+
+def incr(name, amount=1):
+    """Increment a named counter."""
+    with _lock:
+        _counters[name] += amount
+
+
+def get(name, default=0):
+    """Return the current value of a counter."""
+    with _lock:
+        return _counters.get(name, default)
+
+
+def observe(name, value):
+    """Record a measurement (e.g. seconds) for a named timing."""
+    with _lock:
+        _observations[name].append(value)
+
+
+def summary(name):
+    """Return count / avg / last / p95 for a named timing, or None if nothing was recorded."""
+    with _lock:
+        values = list(_observations.get(name, ()))
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        "count": len(values),
+        "avg": sum(values) / len(values),
+        "last": values[-1],
+        "p95": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+    }
+
+
+def snapshot():
+    """Return a copy of all counters."""
+    with _lock:
+        return dict(_counters)
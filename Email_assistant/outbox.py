@@ -0,0 +1,198 @@
+import os
+import time
+import random
+import sqlite3
+import uuid
+import hashlib
+import threading
+
+import metrics
+from sender import deliver_email, find_sent_message
+
+# -----------------------------
+# Persistent outbound queue: sender_node enqueues, a background worker sends
+# with retries. Every message carries a Message-ID derived from its
+# idempotency key, so a send interrupted by a crash is detected in Gmail
+# instead of being sent twice.
+# -----------------------------
+OUTBOX_DB = os.getenv("OUTBOX_DB", "outbox.db")
+MAX_ATTEMPTS = 5
+POLL_SECONDS = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT UNIQUE NOT NULL,
+    recipient TEXT NOT NULL,
+    subject TEXT,
+    body TEXT,
+    status TEXT NOT NULL DEFAULT 'queued',      -- queued | sending | sent | failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    gmail_id TEXT,
+    next_attempt_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at);
+"""
+
+
+def idempotency_key(thread_id, approval_id=None):
+    """
+    One approval -> one key -> one send. approval_id identifies the approval
+    event (not the message content), so replaying that approval is deduplicated
+    while deliberately sending the same email again is not.
+    """
+    raw = "\x1f".join(str(v or "") for v in (thread_id, approval_id or uuid.uuid4().hex))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def message_id_for(key):
+    return f"<{key}@email-assistant.local>"
+
+
+class Outbox:
+    """SQLite-backed queue of outbound emails."""
+
+    def __init__(self, path=OUTBOX_DB):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def enqueue(self, key, to, subject, body):
+        """Queue an email; re-enqueueing an existing key is a no-op."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO outbox (idempotency_key, recipient, subject, body, next_attempt_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, to, subject, body, now, now, now),
+            )
+        metrics.incr("outbox_enqueued")
+        return key
+
+    def status(self, key):
+        """Delivery status for the UI: status, attempts, last_error, gmail_id."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT idempotency_key, recipient, subject, status, attempts, last_error, gmail_id "
+                "FROM outbox WHERE idempotency_key = ?", (key,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def claim_next(self):
+        """Atomically move the next due message from queued to sending."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT * FROM outbox WHERE status = 'queued' AND next_attempt_at <= ? "
+                    "ORDER BY next_attempt_at LIMIT 1", (time.time(),)
+                ).fetchone()
+                if row:
+                    self._conn.execute(
+                        "UPDATE outbox SET status = 'sending', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                        (time.time(), row["id"]),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return dict(row) if row else None
+
+    def _update(self, key, **fields):
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE outbox SET {columns} WHERE idempotency_key = ?", (*fields.values(), key))
+
+    def mark_sent(self, key, gmail_id):
+        self._update(key, status="sent", gmail_id=gmail_id, last_error=None)
+        metrics.incr("outbox_sent")
+
+    def mark_retry(self, key, attempts, error):
+        """Back off and re-queue, or give up after MAX_ATTEMPTS."""
+        if attempts >= MAX_ATTEMPTS:
+            self._update(key, status="failed", last_error=str(error))
+            metrics.incr("outbox_failed")
+            return
+        delay = random.uniform(0, min(300.0, 2.0 * 2 ** attempts))
+        self._update(key, status="queued", last_error=str(error), next_attempt_at=time.time() + delay)
+        metrics.incr("outbox_retries")
+
+    def find_sent(self, key):
+        """Gmail id of this key's message if an earlier attempt already delivered it."""
+        return find_sent_message(message_id_for(key))
+
+    def recover(self):
+        """
+        After a crash, messages left in 'sending' may or may not have gone out.
+        Check Gmail for their Message-ID before putting them back in the queue.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT idempotency_key, attempts FROM outbox WHERE status = 'sending'").fetchall()
+        for row in rows:
+            key = row["idempotency_key"]
+            try:
+                gmail_id = self.find_sent(key)
+            except Exception as e:
+                self.mark_retry(key, row["attempts"], e)
+                continue
+            if gmail_id:
+                self.mark_sent(key, gmail_id)
+            else:
+                self._update(key, status="queued", next_attempt_at=time.time())
+
+
+class OutboxWorker(threading.Thread):
+    """Background sender draining the outbox."""
+
+    def __init__(self, outbox):
+        super().__init__(daemon=True, name="outbox-worker")
+        self.outbox = outbox
+        self._stop_event = threading.Event()
+
+    def run(self):
+        self.outbox.recover()
+        while not self._stop_event.is_set():
+            row = self.outbox.claim_next()
+            if row is None:
+                self._stop_event.wait(POLL_SECONDS)
+                continue
+            key = row["idempotency_key"]
+            try:
+                # A failed earlier attempt (timeout, 5xx) may still have reached Gmail
+                gmail_id = self.outbox.find_sent(key) if row["attempts"] > 0 else None
+                if gmail_id:
+                    self.outbox.mark_sent(key, gmail_id)
+                    print(f"📧 Email to {row['recipient']} was already delivered")
+                    continue
+                gmail_id = deliver_email(row["recipient"], row["subject"], row["body"], message_id=message_id_for(key))
+                self.outbox.mark_sent(key, gmail_id)
+                print(f"📧 Email sent to {row['recipient']}")
+            except Exception as e:
+                print(f"An error occurred: {e}")
+                self.outbox.mark_retry(key, row["attempts"] + 1, e)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_outbox = None
+_worker = None
+_init_lock = threading.Lock()
+
+
+def get_outbox():
+    """Shared outbox, with its background worker started on first use."""
+    global _outbox, _worker
+    with _init_lock:
+        if _outbox is None:
+            _outbox = Outbox()
+        if _worker is None or not _worker.is_alive():
+            _worker = OutboxWorker(_outbox)
+            _worker.start()
+    return _outbox
@@ -5,7 +5,11 @@ from langchain_community.vectorstores import FAISS
 from langchain.chains import RetrievalQA
 from langchain.prompts import PromptTemplate
 from langchain.docstore.document import Document
-from langchain_groq import ChatGroq
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_registry import get_llm
+from ratelimit import llm_invoke
 import warnings
 from dotenv import load_dotenv
 warnings.filterwarnings('ignore')
@@ -29,7 +33,7 @@ vectorstore = FAISS.from_documents(splits, embeddings)
 
 retriever = vectorstore.as_retriever(search_kwargs={"k": 2})
 
-llm = ChatGroq(model="openai/gpt-oss-20b", temperature=0)
+llm = get_llm("openai/gpt-oss-20b", temperature=0)
 
 # Guardrail prompt
 QA_PROMPT = PromptTemplate(
@@ -72,7 +76,7 @@ qa_chain = RetrievalQA.from_chain_type(
 
 def qa_generator(query: str):
     """Run QA chain and return parsed answer or flag status."""
-    result = qa_chain({"query": query})
+    result = llm_invoke(qa_chain, {"query": query})
     raw_answer = result["result"].strip()
     parsed = json.loads(raw_answer)
     return parsed   # just return parsed dict, let node handle state
@@ -0,0 +1,197 @@
+import os
+import time
+import random
+import asyncio
+import threading
+
+import metrics
+
+# -----------------------------
+# Central token-bucket scheduler shared by every Gmail and Groq call site.
+# Calls reserve quota units up front and sleep until their reservation is
+# due, so bursts are queued and paced instead of failing with 429s.
+# -----------------------------
+
+# Gmail API quota units per method (per-user limit is 250 units / second)
+GMAIL_QUOTA_UNITS = {
+    "messages.list": 5,
+    "messages.get": 5,
+    "messages.send": 100,
+    "messages.trash": 5,
+    "threads.list": 10,
+    "threads.get": 10,
+}
+GMAIL_UNITS_PER_SECOND = float(os.getenv("GMAIL_UNITS_PER_SECOND", "250"))
+GROQ_REQUESTS_PER_MINUTE = float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+
+RATE_LIMIT_STATUSES = {429, 503}
+# Quota rejections are never applied server-side; a 503 may have been
+NON_IDEMPOTENT_RETRY_STATUSES = {429, 403}
+# Gmail methods that must not be re-sent after an ambiguous failure
+NON_IDEMPOTENT_METHODS = {"messages.send"}
+MAX_RETRIES = 4
+
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out reservations (seconds to wait)."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate                # tokens per second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0        # set from Retry-After
+        self._lock = threading.Lock()
+
+    def reserve(self, cost):
+        """Take `cost` tokens (going into debt if needed) and return how long to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= min(cost, self.capacity)
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def block_for(self, seconds):
+        """Stop handing out tokens for `seconds` (e.g. after a Retry-After)."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+def rate_limit_info(error):
+    """
+    Inspect an exception from googleapiclient, httpx or the Groq SDK.
+
+    Returns:
+        (rate_limited, retry_after_seconds or None, status or None)
+    """
+    status, headers = None, {}
+    resp = getattr(error, "resp", None)             # googleapiclient.errors.HttpError
+    if resp is not None:
+        status, headers = getattr(resp, "status", None), resp
+    response = getattr(error, "response", None)     # httpx.HTTPStatusError / groq.APIStatusError
+    if response is not None and status is None:
+        status, headers = getattr(response, "status_code", None), getattr(response, "headers", {})
+    status = status or getattr(error, "status_code", None)
+
+    rate_limited = status in RATE_LIMIT_STATUSES or (
+        status == 403 and "ratelimitexceeded" in str(error).lower()
+    )
+    retry_after = None
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        retry_after = float(value) if value is not None else None
+    except (TypeError, ValueError, AttributeError):
+        pass
+    return rate_limited, retry_after, status
+
+
+class Scheduler:
+    """Paces calls per resource ("gmail", "groq") and exposes queue depth / throttle time."""
+
+    def __init__(self):
+        self.buckets = {
+            "gmail": TokenBucket(GMAIL_UNITS_PER_SECOND, GMAIL_UNITS_PER_SECOND),
+            "groq": TokenBucket(GROQ_REQUESTS_PER_MINUTE / 60.0, max(1.0, GROQ_REQUESTS_PER_MINUTE / 6)),
+        }
+
+    def cost(self, resource, method, cost=None):
+        if cost is not None:
+            return cost
+        return GMAIL_QUOTA_UNITS.get(method, 5) if resource == "gmail" else 1
+
+    def _reserve(self, resource, method, cost):
+        units = self.cost(resource, method, cost)
+        metrics.incr(f"{resource}_quota_units", units)
+        return self.buckets[resource].reserve(units)
+
+    def _record_wait(self, resource, wait):
+        metrics.incr(f"{resource}_throttled_calls")
+        metrics.observe(f"{resource}_throttle_seconds", wait)
+
+    def acquire(self, resource, method=None, cost=None):
+        """Block until the call may proceed."""
+        wait = self._reserve(resource, method, cost)
+        if wait > 0:
+            self._record_wait(resource, wait)
+            metrics.incr(f"{resource}_queue_depth")
+            try:
+                time.sleep(wait)
+            finally:
+                metrics.incr(f"{resource}_queue_depth", -1)
+
+    async def aacquire(self, resource, method=None, cost=None):
+        """Async counterpart of acquire()."""
+        wait = self._reserve(resource, method, cost)
+        if wait > 0:
+            self._record_wait(resource, wait)
+            metrics.incr(f"{resource}_queue_depth")
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                metrics.incr(f"{resource}_queue_depth", -1)
+
+    def honour_retry_after(self, resource, error, attempt, idempotent=True):
+        """
+        On a rate-limit error, pause the resource and return the delay applied (or None).
+        Non-idempotent calls are only retried on 429 / 403 rateLimitExceeded, never on 503.
+        """
+        rate_limited, retry_after, status = rate_limit_info(error)
+        if not idempotent and status not in NON_IDEMPOTENT_RETRY_STATUSES:
+            rate_limited = False
+        if not rate_limited or attempt >= MAX_RETRIES:
+            return None
+        delay = retry_after if retry_after is not None else random.uniform(0, min(30.0, 0.5 * 2 ** attempt))
+        self.buckets[resource].block_for(delay)
+        metrics.incr(f"{resource}_rate_limited")
+        return delay
+
+    def call(self, resource, method, fn, *args, cost=None, idempotent=True, **kwargs):
+        """Run fn(*args, **kwargs) under the resource's rate limit, retrying on 429."""
+        attempt = 0
+        while True:
+            self.acquire(resource, method, cost)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if self.honour_retry_after(resource, e, attempt, idempotent) is None:
+                    raise
+                attempt += 1
+
+    async def acall(self, resource, method, fn, *args, cost=None, idempotent=True, **kwargs):
+        """Async counterpart of call(); fn must return an awaitable."""
+        attempt = 0
+        while True:
+            await self.aacquire(resource, method, cost)
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                if self.honour_retry_after(resource, e, attempt, idempotent) is None:
+                    raise
+                attempt += 1
+
+    def queue_depth(self, resource):
+        return metrics.get(f"{resource}_queue_depth")
+
+
+scheduler = Scheduler()
+
+
+def gmail_execute(request, method, cost=None, idempotent=None):
+    """
+    Execute a googleapiclient request through the scheduler. Sends default to
+    non-idempotent, so a 503 (which Gmail may have applied) is not re-sent.
+    """
+    if idempotent is None:
+        idempotent = method not in NON_IDEMPOTENT_METHODS
+    return scheduler.call("gmail", method, request.execute, cost=cost, idempotent=idempotent)
+
+
+def llm_invoke(llm, *args, **kwargs):
+    """Invoke a chat model (or any runnable) through the Groq rate limit."""
+    return scheduler.call("groq", getattr(llm, "model_name", None), llm.invoke, *args, **kwargs)
+
+
+async def llm_ainvoke(llm, *args, **kwargs):
+    return await scheduler.acall("groq", getattr(llm, "model_name", None), llm.ainvoke, *args, **kwargs)
@@ -0,0 +1,52 @@
+import threading
+from collections import OrderedDict
+
+import metrics
+
+
+class RequestDeduper:
+    """
+    Memoizes the last graph result per session, keyed by submission id.
+
+    Streamlit re-executes app.py on every widget interaction; a rerun for a
+    submission that has already been executed returns the cached result
+    instead of invoking the graph (and Gmail / the LLM) again.
+    """
+
+    def __init__(self, max_sessions=1000):
+        self.max_sessions = max_sessions
+        self._last = OrderedDict()   # session_id -> (submission_id, result)
+        self._lock = threading.Lock()
+
+    def lookup(self, session_id, submission_id):
+        """Return (hit, result) for a session's submission."""
+        with self._lock:
+            entry = self._last.get(session_id)
+            if entry and entry[0] == submission_id:
+                self._last.move_to_end(session_id)
+                return True, entry[1]
+        return False, None
+
+    def store(self, session_id, submission_id, result):
+        with self._lock:
+            self._last[session_id] = (submission_id, result)
+            self._last.move_to_end(session_id)
+            while len(self._last) > self.max_sessions:
+                self._last.popitem(last=False)
+
+    def run(self, session_id, submission_id, fn):
+        """
+        Run fn() once per (session_id, submission_id).
+
+        Returns:
+            (result, cached): cached is True when the result came from memory.
+        """
+        hit, result = self.lookup(session_id, submission_id)
+        if hit:
+            metrics.incr("graph_invocations_avoided")
+            return result, True
+
+        result = fn()
+        metrics.incr("graph_invocations")
+        self.store(session_id, submission_id, result)
+        return result, False
@@ -6,6 +6,7 @@ from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from email.mime.text import MIMEText
+from ratelimit import gmail_execute
 
 warnings.filterwarnings('ignore')
 load_dotenv(override=True)
@@ -19,6 +20,8 @@ REFRESH_TOKEN = os.getenv("REFRESH_TOKEN")
 # Scopes required for sending emails
 SCOPES = ['https://www.googleapis.com/auth/gmail.send']
 
+SENDER_EMAIL = "krishusertest99@gmail.com"
+
 def get_gmail_service():
     """
     Authenticates using a refresh token and returns a Gmail API service object.
@@ -37,7 +40,7 @@ def get_gmail_service():
     service = build('gmail', 'v1', credentials=creds)
     return service
 
-def create_message(sender, to, subject, message_text):
+def create_message(sender, to, subject, message_text, message_id=None):
     """
     Creates an email message.
     """
@@ -45,6 +48,8 @@ def create_message(sender, to, subject, message_text):
     message['to'] = to
     message['from'] = sender
     message['subject'] = subject
+    if message_id:
+        message['Message-ID'] = message_id
 
     raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
     return {'raw': raw_message}
@@ -54,10 +59,10 @@ def send_email(recipient_email, subject, body):
     Sends an email using the Gmail API.
     """
     service=get_gmail_service()
-    sender_email = "krishusertest99@gmail.com"
+    sender_email = SENDER_EMAIL
     try:
         message = create_message(sender_email, recipient_email, subject, body)
-        sent_message = service.users().messages().send(userId='me', body=message).execute()
+        sent_message = gmail_execute(service.users().messages().send(userId='me', body=message), "messages.send")
         print(f"Message Id: {sent_message['id']}")
         return "Success!"
     except Exception as e:
@@ -65,6 +70,28 @@ def send_email(recipient_email, subject, body):
         return "Failed!"
     
 
+def deliver_email(recipient_email, subject, body, message_id=None):
+    """
+    Sends an email and returns the Gmail message id; errors are raised so the
+    caller (the outbox worker) can retry.
+    """
+    service = get_gmail_service()
+    message = create_message(SENDER_EMAIL, recipient_email, subject, body, message_id=message_id)
+    sent_message = gmail_execute(service.users().messages().send(userId='me', body=message), "messages.send")
+    return sent_message['id']
+
+
+def find_sent_message(message_id):
+    """Returns the Gmail id of a sent message with the given Message-ID header, or None."""
+    service = get_gmail_service()
+    response = gmail_execute(
+        service.users().messages().list(userId='me', q=f"in:sent rfc822msgid:{message_id}", maxResults=1),
+        "messages.list"
+    )
+    messages = response.get('messages', [])
+    return messages[0]['id'] if messages else None
+
+
 #Testing part
 
 # if __name__ == '__main__':
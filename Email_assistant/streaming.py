@@ -0,0 +1,50 @@
+import time
+
+import metrics
+
+# LLM calls tagged with STREAM_TAG have their tokens forwarded to the UI
+STREAM_TAG = "stream_to_ui"
+
+
+def stream_graph(graph, payload, config, on_token=None, on_event=None):
+    """
+    Runs the graph with the "messages", "custom" and "values" stream modes.
+
+    Tokens from LLM calls tagged with STREAM_TAG are passed to on_token(node, text)
+    as they arrive, and events a node emits through get_stream_writer() (e.g. bulk
+    delete progress) to on_event(event). The last "values" chunk is returned as the
+    graph result, so callers get the same dict (including "__interrupt__") that
+    invoke() returns.
+
+    Returns:
+        (response, stats): stats holds time-to-first-token, total time and token count.
+    """
+    start = time.perf_counter()
+    ttft = None
+    tokens = 0
+    response = None
+
+    for mode, chunk in graph.stream(payload, config=config, stream_mode=["messages", "custom", "values"]):
+        if mode == "values":
+            response = chunk
+            continue
+        if mode == "custom":
+            if on_event:
+                on_event(chunk)
+            continue
+
+        message, meta = chunk
+        text = message.content if isinstance(message.content, str) else ""
+        if not text or STREAM_TAG not in (meta.get("tags") or []):
+            continue
+
+        if ttft is None:
+            ttft = time.perf_counter() - start
+            metrics.observe("ttft_seconds", ttft)
+        tokens += 1
+        if on_token:
+            on_token(meta.get("langgraph_node"), text)
+
+    total = time.perf_counter() - start
+    metrics.observe("graph_seconds", total)
+    return response, {"ttft": ttft, "total": total, "tokens": tokens}
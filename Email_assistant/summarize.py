@@ -1,7 +1,12 @@
 from googleapiclient.discovery import build
 from sender import get_gmail_service
 import base64
-from langchain_groq import ChatGroq
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_registry import get_llm
+from streaming import STREAM_TAG
+from ratelimit import gmail_execute, llm_invoke
 import warnings
 from dotenv import load_dotenv
 warnings.filterwarnings('ignore')
@@ -19,10 +24,13 @@ def extract_metadata(message):
             
     return metadata
 
-def get_thread_summary(user_id, thread_id):
-    service = get_gmail_service()
-    thread = service.users().threads().get(userId=user_id, id=thread_id).execute()
+def build_thread_prompt(thread):
+    """
+    Decodes a Gmail thread resource into the summary prompt.
 
+    Returns:
+        (first_metadata, prompt): sender/recipient of the first message and the LLM prompt.
+    """
     full_thread_content = []
     metadata_info = []
 
@@ -45,7 +53,6 @@ def get_thread_summary(user_id, thread_id):
 
     # Simplify metadata: pick first message's sender/recipient
     first_metadata = metadata_info[0] if metadata_info else {'from': 'Unknown', 'to': 'Unknown'}
-    llm= ChatGroq(model="gemma2-9b-it", temperature= 0)
     # Generate prompt
     prompt = f"""
 You are an intelligent email assistant that summarizes email threads.
@@ -60,9 +67,22 @@ Here is the full content of the email thread:
 
 Provide a clear and concise summary of the email thread in a few sentences.
 """
+    return first_metadata, prompt
+
+
+def get_thread_summary(user_id, thread_id):
+    service = get_gmail_service()
+    thread = gmail_execute(service.users().threads().get(userId=user_id, id=thread_id), "threads.get")
+
+    first_metadata, prompt = build_thread_prompt(thread)
+    llm= get_llm("gemma2-9b-it", temperature= 0)
 
-    # Call the LLM function
-    summary = llm.invoke([{"role": "user", "content": prompt}]).content.strip()
+    # Call the LLM function (tagged so the UI can stream the summary as it is generated)
+    summary = llm_invoke(
+        llm,
+        [{"role": "user", "content": prompt}],
+        config={"tags": [STREAM_TAG]}
+    ).content.strip()
 
     return {
         "sender": first_metadata['from'],
@@ -86,7 +106,7 @@ def find_thread_id(service, user_id, query):
     """
     try:
         # Use the list method with a query to find threads
-        response = service.users().threads().list(userId=user_id, q=query).execute()
+        response = gmail_execute(service.users().threads().list(userId=user_id, q=query), "threads.list")
         threads = response.get('threads', [])
         
         if not threads:
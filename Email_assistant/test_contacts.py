@@ -0,0 +1,34 @@
+from contacts import ContactIndex
+
+
+def test_fuzzy_name_is_not_unambiguous():
+    index = ContactIndex({"Robert": "rob@z.com"})
+    assert index.unambiguous("send email to Roberta about the launch") is None
+    assert [how for *_, how in index.resolve("send email to Roberta about the launch")] == ["fuzzy"]
+
+
+def test_partial_name_is_not_unambiguous():
+    index = ContactIndex({"Alice Smith": "alice@x.com"})
+    assert index.unambiguous("Send an email to Alice Johnson") is None
+    assert index.relevant_book("Send an email to Alice Johnson") == {"Alice Smith": "alice@x.com"}
+
+
+def test_exact_name_and_address_are_unambiguous():
+    index = ContactIndex({"Robert": "rob@z.com", "Alice Smith": "alice@x.com"})
+    assert index.unambiguous("email Robert about the launch") == ("Robert", "rob@z.com")
+    assert index.unambiguous("email alice smith the notes") == ("Alice Smith", "alice@x.com")
+    assert index.unambiguous("email bob@new.com the notes") == ("", "bob@new.com")
+
+
+def test_leading_verb_is_not_part_of_the_name():
+    from contacts import extract_contacts, upsert_contacts
+    contacts, unresolved = extract_contacts("Forward Alice <alice@new.com> the report")
+    assert contacts == {"Alice": "alice@new.com"} and unresolved == []
+    book, changed = upsert_contacts({"Alice": "alice@old.com"}, contacts)
+    assert changed and book == {"Alice": "alice@new.com"}
+
+
+def test_verb_only_capture_is_left_unresolved():
+    from contacts import extract_contacts
+    assert extract_contacts("Forward <x@y.com> now") == ({}, ["x@y.com"])
+    assert extract_contacts("Email Alice's email is a@b.com") == ({"Alice": "a@b.com"}, [])
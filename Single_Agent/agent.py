@@ -1,122 +1,69 @@
-from dataclasses import dataclass, field
-from typing import List
-import streamlit as st
-import fitz
+import io
 import os
-from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage
-from dataclasses import replace
-from langchain_core.prompts import ChatPromptTemplate
-from langgraph.graph import StateGraph, START, END
-
-
-import warnings
-from dotenv import load_dotenv
-warnings.filterwarnings('ignore')
-load_dotenv(override=True)
-
-@dataclass
-class State:
-    job_description: str = ""
-    resume: str = ""
-    summary: str = ""
-    skills: List[str] = field(default_factory=list)
-    match_score: float = 0.0
-    suggestions: str = ""
-
-######################################################
-llm= ChatGroq(model="gemma2-9b-it", temperature= 0)
-
-def Summarize_node(state:State):
-    jd = state.job_description
-    response =llm.invoke([
-        HumanMessage(content=f"Summarize the following job description in 3 lines: \n{jd} ")
-    ])
-
-    summary =response.content
-    return replace(state, summary=summary)
-######################################################
-
-def extract_skills_node(state:State):
-    jd = state.job_description
-    
-    prompt_template = ChatPromptTemplate.from_messages([
-    ("system", "You are an expert recruiter extracting key skills."),
-    ("human", "Extract only the key technical and soft skills from the following job description and return them as a flat Python list (no explanations or formatting):\n\n{jd}")
-])
-
-    prompt = prompt_template.format_messages(jd=jd)
-
-    response = llm.invoke(prompt)
-
-    skills_text = response.content
-
-    try:
-        skills = eval(skills_text)
-        if not isinstance(skills, list):
-            raise ValueError()
-    
-    except:
-        skills = [s.strip() for s in skills_text.split(",")]
-
-    return replace(state, skills=skills)
-
-######################################################
-def match_resume_node(state: State):
-    skills = state.skills
-    resume = state.resume.lower()
-
-    matched = [skill for skill in skills if skill.lower() in resume]
-    score =round ((len(matched) / len(skills))*100, 2) if skills else 0.0
-
-    return replace(state, match_score=score)
-
-######################################################
-def suggest_improvements_node(state:State):
-    llm = ChatGroq(model="gemma2-9b-it", temperature= 0.3)
-    jd = state.job_description
-    resume = state.resume
-
-    prompt =(
-        f"My resume is : \n{resume}\n\n"
-        f"Job Description: \n{jd}\n\n"
-        f"Suggest specific improvements to better match the resume to this JD."
-    )
-    
-    response = llm.invoke(prompt)
-    return replace(state, suggestions=response.content)
-
-######################################################
-builder = StateGraph(State)
-
-builder.add_node("Summarize", Summarize_node)
-builder.add_node("extract_skills",extract_skills_node)
-builder.add_node("match_resume", match_resume_node)
-builder.add_node("Suggestions", suggest_improvements_node)
-
-builder.add_edge(START, "Summarize")
-builder.add_edge("Summarize", "extract_skills")
-builder.add_edge("extract_skills", "match_resume")
-
-#Conditional edge
-def check_match(state):
-    return "Suggestions" if state.match_score < 75 else "end"
-
-builder.add_conditional_edges(
-    "match_resume",
-    check_match,
-    {
-        "Suggestions": "Suggestions",
-        "end": END
-    }
-)
-
+import tempfile
+import streamlit as st
 
-builder.add_edge("Suggestions", END)
+from resume_graph import app, MATCH_THRESHOLD
+from batch import analyze_jd, screen_resumes, suggest_for, write_csv
+from skills_parser import get_parse_stats
+from pdf_ingest import MATCH_SECTIONS, extract_sections, extract_text, targeted_text
+
+
+def render_batch_page():
+    """Screen many resumes against one JD and download a ranked CSV."""
+    st.title("📚 Batch Resume Screening")
+    jd = st.text_area("Paste the Job Description here:", height=200)
+    files = st.file_uploader("Upload resumes (PDF)", type="pdf", accept_multiple_files=True)
+    top_n = st.number_input("Generate suggestions for the top N resumes", min_value=0, max_value=50, value=5)
+    by_section = st.checkbox("Match only skills / experience / projects sections")
+
+    if st.button("🚀 Screen resumes") and jd and files:
+        with tempfile.TemporaryDirectory() as tmp, st.spinner(f"Screening {len(files)} resumes..."):
+            paths = []
+            for i, f in enumerate(files, start=1):
+                # Index prefix keeps same-named uploads apart on disk and in the ranking
+                path = os.path.join(tmp, f"{i:03d}_{os.path.basename(f.name)}")
+                with open(path, "wb") as out:
+                    out.write(f.getbuffer())
+                paths.append(path)
+            summary, skills = analyze_jd(jd)
+            _, rows = screen_resumes(jd, paths, top_n=top_n, skills=skills, sections=MATCH_SECTIONS if by_section else None)
+        st.session_state.batch = {"jd": jd, "summary": summary, "skills": skills, "rows": rows}
+
+    batch = st.session_state.get("batch")
+    if not batch:
+        return
 
+    st.subheader("📌 Job Description Summary:")
+    st.write(batch["summary"])
+    st.subheader("💼 Extracted Key Skills:")
+    st.write(batch["skills"])
 
-app= builder.compile()
-######################################################
+    st.subheader("📊 Ranking")
+    st.dataframe(
+        [{k: r[k] for k in ("rank", "file", "match_score")} | {"matched": ", ".join(r["matched_skills"])} for r in batch["rows"]],
+        use_container_width=True,
+    )
+    csv_buffer = io.StringIO()
+    write_csv(batch["rows"], csv_buffer)
+    st.download_button("⬇️ Download ranked CSV", csv_buffer.getvalue(), file_name="ranked_resumes.csv", mime="text/csv")
+
+    # Suggestions on demand for anyone outside the top N
+    choice = st.selectbox("Suggestions for", [r["file"] for r in batch["rows"]])
+    row = next(r for r in batch["rows"] if r["file"] == choice)
+    if not row["suggestions"] and st.button("🛠 Generate suggestions"):
+        with st.spinner("Generating suggestions..."):
+            row["suggestions"] = suggest_for(batch["jd"], row["resume"])
+    if row["suggestions"]:
+        st.write(row["suggestions"])
+
+
+mode = st.sidebar.radio("Mode", ["Single resume", "Batch screening"])
+with st.sidebar.expander("Skill parsing"):
+    st.json(get_parse_stats())
+if mode == "Batch screening":
+    render_batch_page()
+    st.stop()
 
 st.title("🔍 Resume Matcher AI")
 
@@ -132,14 +79,16 @@ if uploaded_file:
     st.success("Job description received!")
 
 
-def extract_text_from_pdf(file):
-    doc = fitz.open(stream=file.read(), filetype="pdf")
-    return "".join([page.get_text() for page in doc])
-
+by_section = st.checkbox("Match only skills / experience / projects sections")
 
 
 if uploaded_file is not None:
-    resume_text = extract_text_from_pdf(uploaded_file)
+    # Cached by file hash: reruns don't re-parse the PDF
+    resume_text = extract_text(uploaded_file)
+    with st.expander("📄 Detected resume sections"):
+        st.write(list(extract_sections(resume_text)))
+    if by_section:
+        resume_text = targeted_text(resume_text)
 
     with st.spinner("🚀 Running Resume Matcher..."):
         result = app.invoke({
@@ -158,8 +107,10 @@ if uploaded_file is not None:
 
     st.subheader("📊 Resume Match Score:")
     st.metric(label="Match Score (%)", value=result["match_score"])
+    with st.expander("🔎 Skill evidence"):
+        st.dataframe(result["skill_matches"], use_container_width=True)
 
-    if result["match_score"] < 75:
+    if result["match_score"] < MATCH_THRESHOLD:
         st.subheader("🛠 Suggestions to Improve Your Resume:")
         st.write(result["suggestions"])
     else:
@@ -0,0 +1,126 @@
+import os
+import csv
+import glob
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from pdf_ingest import MATCH_SECTIONS, extract_text, targeted_text
+from resume_graph import (
+    State,
+    Summarize_node,
+    extract_skills_node,
+    match_skills,
+    suggest_improvements_node,
+)
+
+# -----------------------------
+# Batch screening: one JD against a directory of resumes.
+# JD skills are extracted once, PDFs are parsed in a process pool, every
+# resume is scored locally and the suggestions LLM only runs for the top N.
+# python batch.py --jd jd.txt --resumes ./resumes --out ranked.csv --top-n 5
+# -----------------------------
+CSV_FIELDS = ["rank", "file", "match_score", "matched_skills", "missing_skills", "suggestions"]
+
+
+def extract_pdf_text(path):
+    """Runs in a worker process: (path, text) for one PDF, '' if it can't be read."""
+    try:
+        return path, extract_text(path)
+    except Exception as e:
+        print(f"Could not read {path}: {e}")
+        return path, ""
+
+
+def analyze_jd(jd_text):
+    """Summary + skills for a job description (the only per-JD LLM work)."""
+    state = State(job_description=jd_text)
+    summary = Summarize_node(state)["summary"]
+    skills = extract_skills_node(state)["skills"]
+    return summary, skills
+
+
+def suggest_for(jd_text, resume_text):
+    """On-demand suggestions for one resume."""
+    return suggest_improvements_node(State(job_description=jd_text, resume=resume_text))["suggestions"]
+
+
+def screen_resumes(jd_text, pdf_paths, top_n=5, workers=None, skills=None, sections=None):
+    """
+    Scores every resume against the JD and returns (skills, ranked rows).
+
+    Each row holds file, match_score, matched/missing skills, resume text and
+    suggestions (filled in only for the top_n resumes). With sections, skills
+    are matched only against those resume sections (e.g. skills, experience).
+    """
+    if skills is None:
+        _, skills = analyze_jd(jd_text)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        texts = list(pool.map(extract_pdf_text, pdf_paths, chunksize=8))
+
+    rows = []
+    for path, text in texts:
+        matched, score = match_skills(skills, targeted_text(text, sections) if sections else text)
+        rows.append({
+            "file": os.path.basename(path),
+            "match_score": score,
+            "matched_skills": matched,
+            "missing_skills": [s for s in skills if s not in matched],
+            "resume": text,
+            "suggestions": "",
+        })
+    rows.sort(key=lambda r: r["match_score"], reverse=True)
+    for rank, row in enumerate(rows, start=1):
+        row["rank"] = rank
+
+    # Suggestions are the expensive part: only for the shortlist, concurrently
+    top = [r for r in rows[:top_n] if r["resume"]]
+    with ThreadPoolExecutor(max_workers=max(1, min(4, len(top)))) as pool:
+        for row, suggestions in zip(top, pool.map(lambda r: suggest_for(jd_text, r["resume"]), top)):
+            row["suggestions"] = suggestions
+
+    return skills, rows
+
+
+def write_csv(rows, out):
+    """Writes the ranked rows (without resume text) to a CSV file or file-like object."""
+    close = isinstance(out, str)
+    f = open(out, "w", newline="", encoding="utf-8") if close else out
+    try:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({
+                **row,
+                "matched_skills": "; ".join(row["matched_skills"]),
+                "missing_skills": "; ".join(row["missing_skills"]),
+            })
+    finally:
+        if close:
+            f.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank a directory of resume PDFs against one job description.")
+    parser.add_argument("--jd", required=True, help="Text file with the job description")
+    parser.add_argument("--resumes", required=True, help="Directory containing resume PDFs")
+    parser.add_argument("--out", default="ranked_resumes.csv")
+    parser.add_argument("--top-n", type=int, default=5, help="Generate suggestions for the N best matches")
+    parser.add_argument("--workers", type=int, default=None, help="PDF extraction processes (default: CPU count)")
+    parser.add_argument("--sections", nargs="*", default=None,
+                        help=f"Match only these resume sections (no value: {' '.join(MATCH_SECTIONS)})")
+    args = parser.parse_args()
+
+    with open(args.jd, encoding="utf-8") as f:
+        jd = f.read()
+    paths = sorted(glob.glob(os.path.join(args.resumes, "*.pdf")))
+    if not paths:
+        raise SystemExit(f"No PDFs found in {args.resumes}")
+
+    sections = (args.sections or MATCH_SECTIONS) if args.sections is not None else None
+    skills, ranked = screen_resumes(jd, paths, top_n=args.top_n, workers=args.workers, sections=sections)
+    write_csv(ranked, args.out)
+    print(f"Skills: {skills}")
+    print(f"Ranked {len(ranked)} resumes -> {args.out}")
+    for row in ranked[:args.top_n]:
+        print(f"{row['rank']:>3}. {row['file']:<40} {row['match_score']:6.2f}%")
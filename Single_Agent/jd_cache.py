@@ -0,0 +1,76 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+# -----------------------------
+# Persistent cache of per-JD LLM results (summary, skill list), keyed by a
+# hash of the normalized job description, so screening many resumes against
+# one posting pays the JD LLM cost once.
+# -----------------------------
+JD_CACHE_DB = os.getenv("JD_CACHE_DB", "jd_cache.db")
+# Bump when the summary / skills prompts or models change
+CACHE_VERSION = "2"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jd_cache (
+    jd_hash TEXT PRIMARY KEY,
+    summary TEXT,
+    skills TEXT,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+def normalize_jd(jd):
+    """Whitespace and case differences don't change the posting."""
+    return " ".join((jd or "").split()).casefold()
+
+
+def jd_hash(jd):
+    return hashlib.sha256(f"{CACHE_VERSION}\x1f{normalize_jd(jd)}".encode("utf-8")).hexdigest()
+
+
+class JDCache:
+    def __init__(self, path=JD_CACHE_DB):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(SCHEMA)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, jd, column):
+        with self._lock:
+            row = self._conn.execute(f"SELECT {column} FROM jd_cache WHERE jd_hash = ?", (jd_hash(jd),)).fetchone()
+            if row and row[0] is not None:
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def _put(self, jd, column, value):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO jd_cache (jd_hash, {column}, updated_at) VALUES (?, ?, ?) "
+                f"ON CONFLICT(jd_hash) DO UPDATE SET {column} = excluded.{column}, updated_at = excluded.updated_at",
+                (jd_hash(jd), value, time.time()),
+            )
+
+    def get_summary(self, jd):
+        return self._get(jd, "summary")
+
+    def put_summary(self, jd, summary):
+        self._put(jd, "summary", summary)
+
+    def get_skills(self, jd):
+        skills = self._get(jd, "skills")
+        return json.loads(skills) if skills is not None else None
+
+    def put_skills(self, jd, skills):
+        self._put(jd, "skills", json.dumps(skills))
+
+
+jd_cache = JDCache()
@@ -0,0 +1,166 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+
+import fitz
+
+# -----------------------------
+# Resume PDF ingestion.
+# Files are hashed in chunks, text is extracted page by page (stopping at a
+# page / character cap so a huge PDF can't blow up memory) and cached by file
+# hash, so Streamlit reruns and repeated batch runs never re-parse a PDF.
+# -----------------------------
+PDF_CACHE_DB = os.getenv("PDF_CACHE_DB", "pdf_cache.db")
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "40"))
+MAX_PDF_CHARS = int(os.getenv("MAX_PDF_CHARS", "200000"))
+HASH_CHUNK = 1 << 20
+# Bump when extraction changes so old cache entries are ignored
+EXTRACTOR_VERSION = "1"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pdf_text (
+    file_hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    pages INTEGER NOT NULL,
+    truncated INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+def file_hash(source):
+    """sha256 of a path or binary file object, read HASH_CHUNK bytes at a time."""
+    digest = hashlib.sha256(EXTRACTOR_VERSION.encode())
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                digest.update(chunk)
+    else:
+        source.seek(0)
+        for chunk in iter(lambda: source.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+        source.seek(0)
+    return digest.hexdigest()
+
+
+def open_pdf(source):
+    if isinstance(source, (str, os.PathLike)):
+        return fitz.open(source)
+    # Streamlit uploads are BytesIO: hand MuPDF the buffer instead of a copy
+    data = source.getbuffer() if hasattr(source, "getbuffer") else source.read()
+    return fitz.open(stream=data, filetype="pdf")
+
+
+def iter_page_text(doc, max_pages=MAX_PDF_PAGES, max_chars=MAX_PDF_CHARS):
+    """Yields page text one page at a time until the page or character cap is hit."""
+    total = 0
+    for number, page in enumerate(doc):
+        if number >= max_pages or total >= max_chars:
+            return
+        text = page.get_text()[:max_chars - total]
+        total += len(text)
+        yield text
+
+
+class PdfTextCache:
+    def __init__(self, path=PDF_CACHE_DB):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(SCHEMA)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM pdf_text WHERE file_hash = ?", (key,)).fetchone()
+            if row:
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, key, text, pages, truncated):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pdf_text (file_hash, text, pages, truncated, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (key, text, pages, int(truncated), time.time()),
+            )
+
+
+_caches = {}  # pid -> PdfTextCache
+
+
+def get_pdf_cache():
+    """
+    The cache for this process, opened on first use. Batch workers are forked,
+    and a SQLite connection (or a held lock) must never cross a fork.
+    """
+    pid = os.getpid()
+    if pid not in _caches:
+        _caches.clear()
+        _caches[pid] = PdfTextCache()
+    return _caches[pid]
+
+
+def extract_text(source):
+    """Text of a PDF path or upload, served from the cache when the file was seen before."""
+    key = file_hash(source)
+    pdf_cache = get_pdf_cache()
+    cached = pdf_cache.get(key)
+    if cached is not None:
+        return cached
+
+    with open_pdf(source) as doc:
+        pages = list(iter_page_text(doc))
+        truncated = len(pages) < doc.page_count or sum(map(len, pages)) >= MAX_PDF_CHARS
+    if truncated:
+        print(f"⚠️ PDF truncated to {len(pages)} pages / {MAX_PDF_CHARS} chars")
+
+    text = "".join(pages)
+    pdf_cache.put(key, text, len(pages), truncated)
+    return text
+
+
+# -----------------------------
+# Layout sections, for matching against just the parts of a resume that list skills
+# -----------------------------
+SECTION_HEADINGS = {
+    "summary": ["summary", "profile", "professional summary", "objective", "about me"],
+    "experience": ["experience", "work experience", "professional experience", "employment history", "work history"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "technologies", "tools"],
+    "projects": ["projects", "personal projects", "key projects"],
+    "education": ["education", "academic background", "qualifications"],
+    "certifications": ["certifications", "certificates", "licenses"],
+}
+MATCH_SECTIONS = ("skills", "experience", "projects")
+
+HEADING_RE = re.compile(
+    r"^\s*(%s)\s*:?\s*$" % "|".join(
+        re.escape(h) for h in sorted({h for hs in SECTION_HEADINGS.values() for h in hs}, key=len, reverse=True)
+    ),
+    re.IGNORECASE,
+)
+HEADING_TO_SECTION = {h: name for name, hs in SECTION_HEADINGS.items() for h in hs}
+
+
+def extract_sections(text):
+    """Splits resume text on heading lines: {section: text}; text before the first heading is 'header'."""
+    sections, current = {}, "header"
+    for line in (text or "").splitlines():
+        heading = HEADING_RE.match(line)
+        if heading:
+            current = HEADING_TO_SECTION[heading.group(1).lower()]
+            continue
+        sections.setdefault(current, []).append(line)
+    return {name: "\n".join(lines).strip() for name, lines in sections.items() if "".join(lines).strip()}
+
+
+def targeted_text(text, sections=MATCH_SECTIONS):
+    """Only the given sections, or the whole text if none of them were found."""
+    found = extract_sections(text)
+    picked = [found[name] for name in sections if name in found]
+    return "\n".join(picked) if picked else text
@@ -0,0 +1,181 @@
+from dataclasses import dataclass, field
+from typing import List
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_registry import get_llm
+from langchain_core.messages import HumanMessage
+from langchain_core.prompts import ChatPromptTemplate
+from langgraph.graph import StateGraph, START, END
+from jd_cache import jd_cache
+from skill_matcher import get_matcher
+from skills_parser import SkillList, dedupe, parse_skills, record
+
+
+import warnings
+from dotenv import load_dotenv
+warnings.filterwarnings('ignore')
+load_dotenv(override=True)
+
+MATCH_THRESHOLD = 75
+SKILLS_MAX_ATTEMPTS = 2
+
+@dataclass
+class State:
+    job_description: str = ""
+    resume: str = ""
+    summary: str = ""
+    skills: List[str] = field(default_factory=list)
+    match_score: float = 0.0
+    skill_matches: List[dict] = field(default_factory=list)
+    suggestions: str = ""
+
+# Nodes return only the fields they produce, so branches running in
+# parallel never write the same key.
+######################################################
+llm= get_llm("gemma2-9b-it", temperature= 0)
+
+def Summarize_node(state:State):
+    jd = state.job_description
+    cached = jd_cache.get_summary(jd)
+    if cached is not None:
+        return {"summary": cached}
+
+    response =llm.invoke([
+        HumanMessage(content=f"Summarize the following job description in 3 lines: \n{jd} ")
+    ])
+
+    summary =response.content
+    jd_cache.put_summary(jd, summary)
+    return {"summary": summary}
+######################################################
+
+def extract_skills_node(state:State):
+    jd = state.job_description
+    cached = jd_cache.get_skills(jd)
+    if cached is not None:
+        return {"skills": cached}
+    
+    prompt_template = ChatPromptTemplate.from_messages([
+    ("system", "You are an expert recruiter extracting key skills."),
+    ("human", "Extract only the key technical and soft skills from the following job description. "
+              "Respond with JSON only, in the form {{\"skills\": [\"skill\", ...]}}:\n\n{jd}")
+])
+
+    prompt = prompt_template.format_messages(jd=jd)
+
+    # JSON mode + schema; raw text is kept so a bad response can still be recovered
+    structured_llm = llm.with_structured_output(SkillList, method="json_mode", include_raw=True)
+
+    skills = []
+    for attempt in range(SKILLS_MAX_ATTEMPTS):
+        if attempt:
+            record("retries")
+        try:
+            response = structured_llm.invoke(prompt)
+        except Exception as e:
+            print(f"⚠️ Skill extraction failed (attempt {attempt + 1}): {e}")
+            continue
+
+        if response["parsed"] is not None:
+            skills = dedupe(response["parsed"].skills)
+            record("structured")
+        else:
+            skills = parse_skills(response["raw"].content)
+            if skills:
+                record("recovered")
+        if skills:
+            break
+
+    if not skills:
+        record("failures")
+        return {"skills": []}
+
+    jd_cache.put_skills(jd, skills)
+    return {"skills": skills}
+
+######################################################
+def match_skills(skills, resume_text, details=False):
+    """Returns (matched skills, match score in %), plus per-skill evidence if details."""
+    results, score = get_matcher(tuple(skills)).match(resume_text)
+
+    matched = [r["skill"] for r in results if r["matched"]]
+    return (matched, score, results) if details else (matched, score)
+
+
+def match_resume_node(state: State):
+    _, score, results = match_skills(state.skills, state.resume, details=True)
+    return {"match_score": score, "skill_matches": results}
+
+######################################################
+def suggest_improvements_node(state:State):
+    llm = get_llm("gemma2-9b-it", temperature= 0.3)
+    jd = state.job_description
+    resume = state.resume
+
+    prompt =(
+        f"My resume is : \n{resume}\n\n"
+        f"Job Description: \n{jd}\n\n"
+        f"Suggest specific improvements to better match the resume to this JD."
+    )
+    
+    response = llm.invoke(prompt)
+    return {"suggestions": response.content}
+
+######################################################
+def keep_suggestions_node(state: State):
+    """Speculative mode: drop suggestions that turned out not to be needed."""
+    return {"suggestions": state.suggestions if state.match_score < MATCH_THRESHOLD else ""}
+
+#Conditional edge
+def check_match(state):
+    return "Suggestions" if state.match_score < MATCH_THRESHOLD else "end"
+
+
+def build_graph(parallel=True, speculative=False):
+    """
+    parallel:    summarization runs alongside skill extraction + matching
+                 (the summary does not feed skill extraction).
+    speculative: suggestions start at the same time as everything else and
+                 are discarded if the match score clears the threshold.
+    """
+    builder = StateGraph(State)
+
+    builder.add_node("Summarize", Summarize_node)
+    builder.add_node("extract_skills",extract_skills_node)
+    builder.add_node("match_resume", match_resume_node)
+    builder.add_node("Suggestions", suggest_improvements_node)
+
+    if not parallel:
+        builder.add_edge(START, "Summarize")
+        builder.add_edge("Summarize", "extract_skills")
+        builder.add_edge("extract_skills", "match_resume")
+    else:
+        builder.add_edge(START, "Summarize")
+        builder.add_edge(START, "extract_skills")
+        builder.add_edge("extract_skills", "match_resume")
+
+    if parallel and speculative:
+        builder.add_node("keep_suggestions", keep_suggestions_node)
+        builder.add_edge(START, "Suggestions")
+        # Join: wait for all three branches before deciding on suggestions
+        builder.add_edge(["Summarize", "match_resume", "Suggestions"], "keep_suggestions")
+        builder.add_edge("keep_suggestions", END)
+        return builder.compile()
+
+    builder.add_conditional_edges(
+        "match_resume",
+        check_match,
+        {
+            "Suggestions": "Suggestions",
+            "end": END
+        }
+    )
+    builder.add_edge("Suggestions", END)
+    if parallel:
+        builder.add_edge("Summarize", END)
+
+    return builder.compile()
+
+
+app= build_graph()
@@ -0,0 +1,176 @@
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+
+# -----------------------------
+# Skill matching engine for match_resume_node.
+# The resume is tokenized once into an index of normalized n-grams; each skill
+# (plus its aliases) is looked up in that index. With sentence-transformers
+# enabled, skills with no exact hit are then scored against every resume
+# n-gram in one batched similarity matrix; by default only exact and alias
+# hits count, since spelling similarity alone matches "Spring Boot" to
+# "spring break".
+# Tokens are whole words, so "C" only matches the token "c", never "CSS".
+# -----------------------------
+MAX_NGRAM = 4
+# Skills this short only ever match exactly (too ambiguous for similarity)
+MIN_SEMANTIC_LENGTH = 4
+
+TOKEN_RE = re.compile(r"[a-z0-9](?:[a-z0-9+#]|\.(?=[a-z0-9]))*[+#]*")
+
+# canonical skill -> other ways resumes write it. Only unambiguous spellings:
+# short forms that are also English words or resume boilerplate ("go", "cv",
+# "ci", "node", "ml", ...) would match prose, so they are left out.
+ALIASES = {
+    "javascript": ["js", "ecmascript"],
+    "node.js": ["nodejs"],
+    "react": ["reactjs", "react.js"],
+    "c++": ["cpp"],
+    "c#": ["csharp"],
+    "postgresql": ["postgres", "psql"],
+    "kubernetes": ["k8s"],
+    "amazon web services": ["aws"],
+    "google cloud platform": ["gcp", "google cloud"],
+    "microsoft azure": ["azure"],
+    "natural language processing": ["nlp"],
+    "large language models": ["llm", "llms"],
+    "continuous integration": ["ci/cd"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "communication": ["communication skills", "communicating"],
+    "problem solving": ["problem-solving", "analytical skills"],
+    "teamwork": ["team player", "collaboration"],
+}
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or "").lower())
+
+
+def normalize_phrase(text):
+    return " ".join(tokenize(text))
+
+
+# Never treated as a skill spelling, even if added to ALIASES by mistake
+AMBIGUOUS_ALIASES = {"go", "cv", "ci", "ts", "tf", "dl", "ml", "node", "r", "c", "it", "as", "ai"}
+
+
+def _alias_table():
+    """Every spelling -> the set of all spellings of the same skill."""
+    table = {}
+    for canonical, variants in ALIASES.items():
+        group = {normalize_phrase(v) for v in [canonical, *variants]} - AMBIGUOUS_ALIASES
+        for spelling in group:
+            table.setdefault(spelling, set()).update(group)
+    return table
+
+
+ALIAS_TABLE = _alias_table()
+
+
+class SentenceEmbedder:
+    """Semantic vectors from sentence-transformers (optional dependency)."""
+    threshold = 0.7
+
+    def __init__(self, model_name="sentence-transformers/all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+
+    def embed(self, phrases):
+        return np.asarray(self.model.encode(list(phrases), batch_size=256, normalize_embeddings=True), dtype=np.float32)
+
+
+@lru_cache(maxsize=1)
+def get_embedder():
+    """SKILL_EMBEDDINGS=sentence-transformers enables the similarity step when installed; None otherwise."""
+    if os.getenv("SKILL_EMBEDDINGS", "none") == "sentence-transformers":
+        try:
+            return SentenceEmbedder()
+        except ImportError:
+            print("sentence-transformers not installed, matching exact skills and aliases only")
+    return None
+
+
+class ResumeIndex:
+    """Tokens of one resume plus every n-gram (n <= MAX_NGRAM) -> first token position."""
+
+    def __init__(self, text):
+        self.text = text or ""
+        self.tokens = tokenize(self.text)
+        self.ngrams = {}
+        for n in range(1, MAX_NGRAM + 1):
+            for i in range(len(self.tokens) - n + 1):
+                self.ngrams.setdefault(" ".join(self.tokens[i:i + n]), i)
+
+    def evidence(self, position, width=6):
+        """A short window of resume tokens around a match."""
+        start = max(0, position - width)
+        return " ".join(self.tokens[start:position + width])
+
+    def semantic_candidates(self):
+        """n-grams worth comparing by similarity (skip single characters)."""
+        return [g for g in self.ngrams if len(g) >= MIN_SEMANTIC_LENGTH and len(g.split()) <= 3]
+
+
+class SkillMatcher:
+    """Precomputes skill spellings and embeddings once; match() is then per resume."""
+
+    def __init__(self, skills, embedder=None):
+        self.skills = [s for s in skills if str(s).strip()]
+        self.embedder = embedder if embedder is not None else get_embedder()
+        self.variants = []
+        for skill in self.skills:
+            phrase = normalize_phrase(skill)
+            self.variants.append(ALIAS_TABLE.get(phrase, set()) | {phrase})
+        self.semantic = [
+            i for i, s in enumerate(self.skills) if len(normalize_phrase(s)) >= MIN_SEMANTIC_LENGTH
+        ] if self.embedder is not None else []
+        self.skill_vectors = (
+            self.embedder.embed([normalize_phrase(self.skills[i]) for i in self.semantic])
+            if self.semantic else None
+        )
+
+    def match(self, resume_text):
+        """
+        Returns:
+            (results, score): one dict per skill with matched / method /
+            similarity / evidence, and the % of skills matched.
+        """
+        index = resume_text if isinstance(resume_text, ResumeIndex) else ResumeIndex(resume_text)
+        results = []
+        for skill, variants in zip(self.skills, self.variants):
+            phrase = normalize_phrase(skill)
+            hit = next((v for v in sorted(variants, key=lambda v: v != phrase) if v in index.ngrams), None)
+            results.append({
+                "skill": skill,
+                "matched": hit is not None,
+                "method": None if hit is None else ("exact" if hit == phrase else "alias"),
+                "similarity": 1.0 if hit is not None else 0.0,
+                "evidence": index.evidence(index.ngrams[hit]) if hit is not None else "",
+            })
+
+        pending = [i for i in self.semantic if not results[i]["matched"]]
+        candidates = index.semantic_candidates()
+        if pending and candidates:
+            rows = [self.semantic.index(i) for i in pending]
+            similarity = self.skill_vectors[rows] @ self.embedder.embed(candidates).T
+            best = similarity.argmax(axis=1)
+            for row, skill_index in enumerate(pending):
+                value = float(similarity[row, best[row]])
+                if value >= self.embedder.threshold:
+                    gram = candidates[best[row]]
+                    results[skill_index].update(
+                        matched=True, method="similar", similarity=round(value, 3),
+                        evidence=index.evidence(index.ngrams[gram]),
+                    )
+
+        matched = sum(r["matched"] for r in results)
+        score = round((matched / len(results)) * 100, 2) if results else 0.0
+        return results, score
+
+
+@lru_cache(maxsize=32)
+def get_matcher(skills):
+    """Matcher for a tuple of skills, reused across resumes screened against the same JD."""
+    return SkillMatcher(list(skills))
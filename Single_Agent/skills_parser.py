@@ -0,0 +1,121 @@
+import ast
+import json
+import re
+import threading
+from typing import List
+
+from pydantic import BaseModel, Field
+
+# -----------------------------
+# Structured skill lists from LLM output.
+# The model is asked for {"skills": [...]} in JSON mode; when its output does
+# not validate, SkillStreamParser recovers every complete string it can
+# (code fences, trailing prose, truncated arrays, Python-style quotes) without
+# ever evaluating the text.
+# -----------------------------
+
+class SkillList(BaseModel):
+    skills: List[str] = Field(description="Key technical and soft skills, one short phrase each")
+
+
+class SkillStreamParser:
+    """
+    Incremental JSON string scanner: feed() chunks, get back skills as they complete.
+
+    The structured-output call isn't streamed, so parse_skills feeds it the
+    whole raw reply in one go; it tolerates truncation either way.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.quote = None
+        self.escaped = False
+        self.buffer = []
+        self.skills = []
+
+    def feed(self, chunk):
+        new = []
+        for ch in chunk:
+            if self.in_string:
+                if self.escaped:
+                    self.buffer.append({"n": "\n", "t": "\t"}.get(ch, ch))
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == self.quote:
+                    self.in_string = False
+                    value = "".join(self.buffer).strip()
+                    if value:
+                        new.append(value)
+                else:
+                    self.buffer.append(ch)
+            # only strings inside an array are skills; keys like "skills" are not
+            elif ch in "\"'" and self.depth:
+                self.in_string, self.quote, self.buffer = True, ch, []
+            elif ch == "[":
+                self.depth += 1
+            elif ch == "]":
+                self.depth = max(0, self.depth - 1)
+        self.skills.extend(new)
+        return new
+
+    def close(self):
+        return dedupe(self.skills)
+
+
+def dedupe(skills):
+    seen, result = set(), []
+    for skill in skills:
+        skill = re.sub(r"\s+", " ", str(skill)).strip(" -*•.\t")
+        if skill and skill.lower() not in seen:
+            seen.add(skill.lower())
+            result.append(skill)
+    return result
+
+
+def parse_skills(text):
+    """Best-effort skill list from raw model text; [] if nothing usable."""
+    text = (text or "").strip()
+    text = re.sub(r"^```\w*|```$", "", text, flags=re.MULTILINE).strip()
+
+    for loader in (json.loads, ast.literal_eval):
+        try:
+            value = loader(text)
+        except Exception:
+            # Malformed replies can raise more than ValueError, e.g.
+            # literal_eval('{["a"]}') -> TypeError: unhashable type
+            continue
+        if isinstance(value, dict):
+            value = value.get("skills")
+        if isinstance(value, list):
+            return dedupe(v for v in value if isinstance(v, (str, int, float)))
+
+    parser = SkillStreamParser()
+    parser.feed(text)
+    skills = parser.close()
+    if skills:
+        return skills
+
+    # No brackets at all: a bulleted or comma separated list (a lone phrase is prose)
+    if "[" not in text and "{" not in text:
+        items = dedupe(re.split(r"[,\n;]", text))
+        return items if len(items) > 1 else []
+    return []
+
+
+# -----------------------------
+# Parse metrics
+# -----------------------------
+_stats = {"structured": 0, "recovered": 0, "retries": 0, "failures": 0}
+_stats_lock = threading.Lock()
+
+
+def record(event):
+    with _stats_lock:
+        _stats[event] += 1
+
+
+def get_parse_stats():
+    with _stats_lock:
+        return dict(_stats)
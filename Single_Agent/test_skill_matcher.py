@@ -0,0 +1,32 @@
+from skill_matcher import SkillMatcher
+
+
+def matched(skills, text):
+    results, _ = SkillMatcher(skills).match(text)
+    return {r["skill"]: r["matched"] for r in results}
+
+
+def test_common_words_are_not_skill_aliases():
+    text = "Curriculum Vitae (CV). Always ready to go the extra mile"
+    assert matched(["Golang", "Computer Vision"], text) == {"Golang": False, "Computer Vision": False}
+
+
+def test_short_abbreviations_do_not_match():
+    text = "TF: 5 ml. CI: n/a. DL, ts, node"
+    skills = ["TensorFlow", "Continuous Integration", "Deep Learning", "TypeScript", "Node.js", "Machine Learning"]
+    assert not any(matched(skills, text).values())
+
+
+def test_single_letter_skill_needs_whole_word():
+    assert matched(["C"], "Built pages with CSS") == {"C": False}
+    assert matched(["C"], "Languages: C, Python") == {"C": True}
+
+
+def test_unambiguous_aliases_still_match():
+    assert matched(["Kubernetes", "PostgreSQL"], "Ran k8s clusters backed by postgres") == {"Kubernetes": True, "PostgreSQL": True}
+
+
+def test_similar_spellings_are_not_skill_hits():
+    text = "Spent spring break leading product management for the MySQL server team"
+    skills = ["Spring Boot", "Project Management", "SQL Server"]
+    assert matched(skills, text) == {"Spring Boot": False, "Project Management": False, "SQL Server": False}
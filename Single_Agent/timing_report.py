@@ -0,0 +1,56 @@
+import sys
+import time
+import argparse
+
+import fitz
+from resume_graph import build_graph
+
+# -----------------------------
+# End-to-end latency of the resume matcher: sequential vs parallel graphs
+# python timing_report.py --jd jd.txt --resume resume.pdf [--runs 3]
+# -----------------------------
+VARIANTS = {
+    "sequential": dict(parallel=False),
+    "parallel": dict(parallel=True),
+    "parallel + speculative suggestions": dict(parallel=True, speculative=True),
+}
+
+
+def time_variant(graph, jd, resume, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = graph.invoke({"job_description": jd, "resume": resume})
+        timings.append(time.perf_counter() - start)
+    return sum(timings) / len(timings), result["match_score"]
+
+
+def timing_report(jd, resume, runs=1):
+    """Print and return average latency per graph variant."""
+    report = {}
+    for name, options in VARIANTS.items():
+        avg, score = time_variant(build_graph(**options), jd, resume, runs)
+        report[name] = avg
+        print(f"{name:<36} {avg * 1000:8.0f} ms  (match score {score})")
+
+    baseline = report["sequential"]
+    for name, avg in report.items():
+        if name != "sequential" and avg:
+            print(f"{name}: {baseline / avg:.2f}x vs sequential")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare resume matcher latency before/after parallel fan-out.")
+    parser.add_argument("--jd", required=True, help="Text file with the job description")
+    parser.add_argument("--resume", required=True, help="Resume PDF")
+    parser.add_argument("--runs", type=int, default=1)
+    args = parser.parse_args()
+
+    with open(args.jd, encoding="utf-8") as f:
+        jd_text = f.read()
+    with fitz.open(args.resume) as doc:
+        resume_text = "".join(page.get_text() for page in doc)
+
+    timing_report(jd_text, resume_text, args.runs)
+    sys.exit(0)
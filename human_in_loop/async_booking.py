@@ -0,0 +1,225 @@
+import os
+import sys
+import time
+import uuid
+import asyncio
+from typing import Optional
+
+import httpx
+import aiosqlite
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.types import Command
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_registry import get_llm
+from new import (
+    CHECKPOINT_DB,
+    FORECAST_TTL_SECONDS,
+    GREETING_TIMEOUT_SECONDS,
+    LLM_GREETING,
+    REJECTION_MESSAGE,
+    FlightState,
+    WeatherTool,
+    across_thread_memory,
+    build_graph,
+    default_greeting,
+    format_weather,
+    greeting_messages,
+    index_by_date,
+    is_confirmed,
+    render_ticket,
+    report_ticket_latency,
+    snapshot_status,
+    weather_suggestion_messages,
+)
+
+# -----------------------------
+# Async flight booking pipeline: weather, safety advice and the ticket run on
+# the event loop (httpx + ainvoke), so one process can serve many concurrent
+# bookings through async_graph.astream. Forecasts share WeatherTool's cache.
+# -----------------------------
+
+class AsyncWeatherTool:
+    """Async twin of WeatherTool: pooled AsyncClient, shared TTL cache, one fetch per city at a time."""
+    _inflight = {}  # city -> asyncio.Task
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.api_key = os.getenv("OPENWEATHER_API_KEY")
+        self.base_url = WeatherTool().base_url
+
+    async def _fetch(self, key: str, city: str) -> dict:
+        try:
+            response = await self.client.get(
+                self.base_url,
+                params={"q": city, "appid": self.api_key, "units": "metric"},
+            )
+            response.raise_for_status()
+            by_date = index_by_date(response.json())
+            with WeatherTool._lock:
+                WeatherTool._cache[key] = (time.monotonic() + FORECAST_TTL_SECONDS, by_date)
+            return by_date
+        finally:
+            self._inflight.pop(key, None)
+
+    async def get_forecast(self, city: str) -> dict:
+        key = city.strip().casefold()
+        with WeatherTool._lock:
+            cached = WeatherTool._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(self._fetch(key, city))
+        return await asyncio.shield(task)
+
+    async def get_weather(self, city: str, date: str) -> str:
+        try:
+            return format_weather(city, date, await self.get_forecast(city))
+        except Exception as e:
+            return f"Error fetching weather: {str(e)}"
+
+
+_weather = {}  # event loop -> AsyncWeatherTool
+
+
+def get_async_weather() -> AsyncWeatherTool:
+    """One pooled weather client per event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _weather:
+        _weather[loop] = AsyncWeatherTool(httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        ))
+    return _weather[loop]
+
+
+# -----------------------------
+# Async nodes
+# -----------------------------
+async def aWeather_prediction(state: FlightState):
+    weather_info = await get_async_weather().get_weather(state.City, state.Date)
+    return {"weather_info": weather_info}
+
+
+async def aSuggetion(state: FlightState):
+    llm = get_llm("llama-3.1-8b-instant", temperature=0.0)
+    response = await llm.ainvoke(weather_suggestion_messages(state.weather_info))
+    return {"safety_advice": response.content}
+
+
+async def afinal_llm_response(state: FlightState):
+    if not is_confirmed(state):
+        return {"llm_output": REJECTION_MESSAGE}
+
+    start = time.perf_counter()
+    greeting_task = None
+    if LLM_GREETING:
+        llm = get_llm("gemma2-9b-it", temperature=0.7)
+        greeting_task = asyncio.ensure_future(llm.ainvoke(greeting_messages(state)))
+
+    ticket = render_ticket(state)
+    render_ms = (time.perf_counter() - start) * 1000
+
+    greeting, greeting_ms = default_greeting(state), None
+    if greeting_task:
+        try:
+            greeting = (await asyncio.wait_for(greeting_task, GREETING_TIMEOUT_SECONDS)).content
+        except Exception as e:
+            print(f"⚠️ Using default greeting: {str(e) or 'timed out'}")
+        greeting_ms = (time.perf_counter() - start) * 1000
+
+    report_ticket_latency(render_ms, greeting_ms)
+    return {"llm_output": f"{greeting}\n\n{ticket}"}
+
+
+ASYNC_NODES = {
+    "Weather_prediction": aWeather_prediction,
+    "Suggetion": aSuggetion,
+    "final_confirmation": afinal_llm_response,
+}
+
+# -----------------------------
+# Async graph + resumable booking API (same SQLite checkpoints as graph_final)
+# -----------------------------
+_graphs = {}  # event loop -> task resolving to (compiled graph, sqlite connection)
+
+
+async def _compile():
+    conn = await aiosqlite.connect(CHECKPOINT_DB)
+    graph = build_graph(ASYNC_NODES).compile(
+        checkpointer=AsyncSqliteSaver(conn),
+        store=across_thread_memory
+    )
+    return graph, conn
+
+
+async def get_async_graph():
+    """Compiled async graph with an AsyncSqliteSaver bound to the running loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _graphs:
+        # A task, so concurrent first callers share one connection
+        _graphs[loop] = asyncio.ensure_future(_compile())
+    graph, _ = await _graphs[loop]
+    return graph
+
+
+async def aclose():
+    """Close this loop's checkpoint connection and weather client."""
+    loop = asyncio.get_running_loop()
+    task = _graphs.pop(loop, None)
+    if task is not None:
+        _, conn = await task
+        await conn.close()
+    weather = _weather.pop(loop, None)
+    if weather is not None:
+        await weather.client.aclose()
+
+
+async def abooking_status(thread_id: str) -> dict:
+    graph = await get_async_graph()
+    return snapshot_status(thread_id, await graph.aget_state({"configurable": {"thread_id": thread_id}}))
+
+
+async def _arun(payload, thread_id: str, user_id: str, on_update=None) -> dict:
+    graph = await get_async_graph()
+    config = {"configurable": {"thread_id": thread_id, "user_id": user_id}}
+    async for update in graph.astream(payload, config=config, stream_mode="updates"):
+        if on_update:
+            on_update(update)
+    return await abooking_status(thread_id)
+
+
+async def astart_booking(city: str, date: str, user_id: str, thread_id: Optional[str] = None, on_update=None) -> dict:
+    """Start a booking; returns at the first question for the user."""
+    return await _arun({"City": city, "Date": date}, thread_id or str(uuid.uuid4()), user_id, on_update)
+
+
+async def aresume_booking(thread_id: str, answer: str, on_update=None) -> dict:
+    """Answer the pending question of a booking (the user_id comes from its checkpoint)."""
+    graph = await get_async_graph()
+    snapshot = await graph.aget_state({"configurable": {"thread_id": thread_id}})
+    if snapshot.interrupts:
+        return await _arun(Command(resume=answer), thread_id, snapshot.metadata.get("user_id"), on_update)
+    if snapshot.next:
+        return await _arun(None, thread_id, snapshot.metadata.get("user_id"), on_update)
+    return await abooking_status(thread_id)
+
+
+if __name__ == "__main__":
+    async def main():
+        # Several bookings share one loop: weather and LLM calls overlap
+        cities = ["Bangalore", "Delhi", "Mumbai", "Chennai"]
+        start = time.perf_counter()
+        try:
+            bookings = await asyncio.gather(*[
+                astart_booking(city, time.strftime("%Y-%m-%d"), user_id="user1") for city in cities
+            ])
+        finally:
+            await aclose()
+        for booking in bookings:
+            print(booking)
+        print(f"⏱ {len(cities)} bookings reached confirmation in {time.perf_counter() - start:.2f}s")
+
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+import os
+import re
+import json
+from urllib.parse import parse_qs, urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from flight_history import HISTORY_PAGE_SIZE, history_store
+from new import booking_status, resume_booking, start_booking
+
+# -----------------------------
+# Minimal HTTP front end for the booking graph.
+# Bookings waiting on a human answer are parked in the SQLite checkpointer,
+# so no request thread is held while the user decides.
+#
+#   POST /bookings                    {"city", "date", "user_id"}  -> status
+#   GET  /bookings/<thread_id>                                     -> status
+#   POST /bookings/<thread_id>/resume {"answer": "yes"}            -> status
+#   GET  /users/<user_id>/flights?limit=&cursor=&destination=      -> history page
+# -----------------------------
+BOOKING_API_PORT = int(os.getenv("BOOKING_API_PORT", "8080"))
+
+BOOKING_PATH = re.compile(r"^/bookings/([\w-]+)$")
+RESUME_PATH = re.compile(r"^/bookings/([\w-]+)/resume$")
+HISTORY_PATH = re.compile(r"^/users/([\w.@-]+)/flights$")
+
+
+class BookingHandler(BaseHTTPRequestHandler):
+    def _send(self, code, body):
+        data = json.dumps(body, default=str).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _json_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        match = HISTORY_PATH.match(url.path)
+        if match:
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            try:
+                limit = min(100, int(query.get("limit", HISTORY_PAGE_SIZE)))
+            except ValueError:
+                return self._send(400, {"error": "limit must be an integer"})
+            records, next_cursor = history_store.history(
+                match.group(1), limit=limit, cursor=query.get("cursor"), destination=query.get("destination")
+            )
+            return self._send(200, {"flights": [r.model_dump() for r in records], "next_cursor": next_cursor})
+
+        match = BOOKING_PATH.match(url.path)
+        if not match:
+            return self._send(404, {"error": "not found"})
+        status = booking_status(match.group(1))
+        self._send(404 if status["status"] == "not_found" else 200, status)
+
+    def do_POST(self):
+        try:
+            body = self._json_body()
+        except ValueError:
+            return self._send(400, {"error": "invalid JSON"})
+
+        try:
+            if self.path == "/bookings":
+                missing = [k for k in ("city", "date", "user_id") if not body.get(k)]
+                if missing:
+                    return self._send(400, {"error": f"missing fields: {', '.join(missing)}"})
+                return self._send(201, start_booking(body["city"], body["date"], body["user_id"], body.get("thread_id")))
+
+            match = RESUME_PATH.match(self.path)
+            if match:
+                if "answer" not in body:
+                    return self._send(400, {"error": "missing field: answer"})
+                status = resume_booking(match.group(1), str(body["answer"]))
+                return self._send(404 if status["status"] == "not_found" else 200, status)
+        except Exception as e:
+            print(f"❌ Booking request failed: {e}")
+            return self._send(500, {"error": str(e)})
+
+        self._send(404, {"error": "not found"})
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", BOOKING_API_PORT), BookingHandler)
+    print(f"🚀 Booking API on http://127.0.0.1:{BOOKING_API_PORT}")
+    server.serve_forever()
@@ -1,27 +1,206 @@
+import os
+import time
 import asyncio
+import argparse
+import statistics
+import anyio
+import httpx
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
+
+MCP_URL = os.getenv("MCP_URL", "http://localhost:8000/mcp")
+TOOLS_TTL_SECONDS = int(os.getenv("MCP_TOOLS_TTL_SECONDS", "300"))
+
+# Errors that mean the session itself is gone; anything else (e.g. a
+# ToolException from the tool) is the call's own result and is not retried.
+TRANSPORT_ERRORS = (
+    httpx.TransportError,
+    ConnectionError,
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+)
+SESSION_TERMINATED = 32600   # code the streamable HTTP client uses for an expired session
+
+
+def is_session_error(error):
+    # anyio task groups in the transport wrap the underlying error
+    if isinstance(error, BaseExceptionGroup):
+        return any(is_session_error(e) for e in error.exceptions)
+    if isinstance(error, TRANSPORT_ERRORS):
+        return True
+    return isinstance(error, McpError) and error.error.code in (CONNECTION_CLOSED, SESSION_TERMINATED)
+
+
+def connections(url=MCP_URL):
+    return {
+        "weather": {
+            "url": url,
+            "transport": "streamable_http",
+        }
+    }
+
+
+class MCPSessionManager:
+    """
+    Keeps one MCP session open for the life of the app instead of negotiating
+    a new streamable HTTP session per setup. The tool list is cached (TTL or
+    invalidate()), calls share the session concurrently up to max_concurrency,
+    and a session lost to a transport error is reopened once before a call
+    gives up. Tool errors are raised to the caller as-is.
+    """
+
+    def __init__(self, url=MCP_URL, server_name="weather", tools_ttl=TOOLS_TTL_SECONDS, max_concurrency=32):
+        self.client = MultiServerMCPClient(connections(url))
+        self.server_name = server_name
+        self.tools_ttl = tools_ttl
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._lock = asyncio.Lock()
+        self._tools_lock = asyncio.Lock()
+        self._runner = None
+        self._stop = None
+        self._session = None
+        self._tools = None
+        self._tools_session = None      # session the cached tools are bound to
+        self._tools_loaded_at = 0.0
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def start(self):
+        async with self._lock:
+            if self._session is None:
+                ready = asyncio.get_running_loop().create_future()
+                self._stop = asyncio.Event()
+                self._runner = asyncio.create_task(self._run(ready))
+                self._session = await ready
+        return self._session
+
+    async def _run(self, ready):
+        # The session's transport must be opened and closed by the same task,
+        # so one background task owns it until close() is called.
+        try:
+            async with self.client.session(self.server_name) as session:
+                ready.set_result(session)
+                await self._stop.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                print(f"⚠️ MCP session closed with error: {e}")
+
+    async def close(self, session=None):
+        """Close the open session; with `session`, only if that session is still the open one."""
+        async with self._lock:
+            if session is not None and session is not self._session:
+                return      # another caller already replaced it
+            if self._runner is not None:
+                self._stop.set()
+                await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = self._session = None
+            self.invalidate_tools()
+
+    def invalidate_tools(self):
+        self._tools = None
+
+    async def get_tools(self, refresh=False):
+        """Tools bound to the open session, reloaded only when stale or invalidated."""
+        async with self._tools_lock:
+            if refresh or self._tools is None or time.monotonic() - self._tools_loaded_at > self.tools_ttl:
+                session = await self.start()
+                self._tools = {tool.name: tool for tool in await load_mcp_tools(session)}
+                self._tools_session = session
+                self._tools_loaded_at = time.monotonic()
+            return list(self._tools.values())
+
+    async def call(self, tool_name, args):
+        async with self._semaphore:
+            for attempt in range(2):
+                tools = {tool.name: tool for tool in await self.get_tools()}
+                session = self._tools_session
+                tool = tools.get(tool_name)
+                if tool is None:
+                    if attempt:
+                        raise KeyError(f"MCP tool not found: {tool_name}")
+                    # Server may have changed its tools since we cached them
+                    self.invalidate_tools()
+                    continue
+                try:
+                    return await tool.ainvoke(args)
+                except Exception as e:
+                    if attempt or not is_session_error(e):
+                        raise
+                    print(f"⚠️ MCP session lost ({e!r}), reopening session")
+                    await self.close(session)
+
 
 class WeatherTool:
-    def __init__(self):
-        self.client = None
-        
+    def __init__(self, manager=None):
+        self.manager = manager or MCPSessionManager()
 
     async def setup(self):
-        """Initialize MCP client + Agent once."""
-        self.client = MultiServerMCPClient(
-            {
-                "weather": {
-                    "url": "http://localhost:8000/mcp",
-                    "transport": "streamable_http",
-                }
-            }
-        )
-        tools = await self.client.get_tools()
+        """Open the MCP session once and list the server's tools."""
+        tools = await self.manager.get_tools()
         print("Available tools:", [t.name for t in tools])
-        weather_tool = tools[0]
-        result = await weather_tool.ainvoke({"city": "Bangalore", "date": "2025-08-28"})
-        print("✅ Weather result:", result) 
+
+    async def get_weather(self, city, date):
+        return await self.manager.call("get_weather", {"city": city, "date": date})
+
+
+# -----------------------------
+# Benchmark: per-call overhead of a fresh client vs. the persistent session
+# python client.py --calls 50 --concurrency 10   (weathertool_mcp.py running locally)
+# -----------------------------
+async def fresh_client_call(args):
+    """The old pattern: new client, new session and get_tools() for every call."""
+    tools = await MultiServerMCPClient(connections()).get_tools()
+    return await tools[0].ainvoke(args)
+
+
+async def timed(coro):
+    start = time.perf_counter()
+    await coro
+    return (time.perf_counter() - start) * 1000
+
+
+def report(label, latencies, wall):
+    print(f"{label:<28} mean {statistics.mean(latencies):8.1f} ms  "
+          f"p50 {statistics.median(latencies):8.1f} ms  total {wall:6.2f}s")
+
+
+async def benchmark(calls=50, concurrency=10, city="Bangalore", date=None):
+    args = {"city": city, "date": date or time.strftime("%Y-%m-%d")}
+
+    start = time.perf_counter()
+    fresh = [await timed(fresh_client_call(args)) for _ in range(calls)]
+    report("fresh client per call", fresh, time.perf_counter() - start)
+
+    async with MCPSessionManager(max_concurrency=concurrency) as manager:
+        await manager.get_tools()
+        print("✅ Weather result:", await manager.call("get_weather", args))
+
+        start = time.perf_counter()
+        reused = [await timed(manager.call("get_weather", args)) for _ in range(calls)]
+        report("persistent session", reused, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        concurrent = await asyncio.gather(*[timed(manager.call("get_weather", args)) for _ in range(calls)])
+        report(f"persistent, {concurrency} concurrent", concurrent, time.perf_counter() - start)
+
+    print(f"Per-call overhead saved: {statistics.mean(fresh) - statistics.mean(reused):.1f} ms")
+
 
 if __name__ == "__main__":
-    tool = WeatherTool()
-    asyncio.run(tool.setup())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Benchmark MCP session reuse against the local weather server.")
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--city", default="Bangalore")
+    parser.add_argument("--date", default=None, help="YYYY-MM-DD (default: today)")
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.calls, args.concurrency, args.city, args.date))
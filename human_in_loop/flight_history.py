@@ -0,0 +1,129 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Optional
+
+from pydantic import BaseModel, Field
+from tabulate import tabulate
+
+# -----------------------------
+# Append-only flight history.
+# Each confirmed booking adds one row (keyed by its thread id, so re-running
+# the node never duplicates it); history is read a page at a time through the
+# (user, date) index, so booking cost doesn't grow with a user's history.
+# -----------------------------
+FLIGHT_HISTORY_DB = os.getenv("FLIGHT_HISTORY_DB", "flight_history.db")
+HISTORY_PAGE_SIZE = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS flights (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    booking_id TEXT NOT NULL UNIQUE,
+    user_id TEXT NOT NULL,
+    passenger_name TEXT,
+    date TEXT NOT NULL DEFAULT '',
+    airline TEXT,
+    origin TEXT,
+    destination TEXT,
+    seat TEXT,
+    departure_time TEXT,
+    summary TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_flights_user_date ON flights (user_id, date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_flights_user_destination ON flights (user_id, destination);
+CREATE INDEX IF NOT EXISTS idx_flights_date ON flights (date);
+"""
+
+COLUMNS = ["passenger_name", "date", "airline", "origin", "destination", "seat", "departure_time", "summary"]
+
+
+class FlightRecord(BaseModel):
+    passenger_name: Optional[str] = Field(default=None, description="Passenger name")
+    date: Optional[str] = Field(default=None, description="Flight date in YYYY-MM-DD format")
+    airline: Optional[str] = Field(default=None, description="Airline name")
+    origin: Optional[str] = Field(default=None, description="Departure city")
+    destination: Optional[str] = Field(default=None, description="Arrival city")
+    seat: Optional[str] = Field(default=None, description="Seat preference")
+    departure_time: Optional[str] = Field(default=None, description="Scheduled departure time")
+    summary: Optional[str] = Field(default=None, description="Concise human-readable ticket summary")
+
+
+def record_from_state(state) -> FlightRecord:
+    """Build the history row straight from FlightState fields (no LLM)."""
+    return FlightRecord(
+        passenger_name=state.passenger_name,
+        date=state.Date,
+        airline=state.flight_name,
+        origin=state.City,
+        destination=state.destination,
+        seat=state.seat_preference,
+        departure_time=state.departure,
+        summary=f"{state.flight_name}: {state.City} → {state.destination} on {state.Date} at {state.departure}, {state.seat_preference} seat",
+    )
+
+
+class FlightHistoryStore:
+    def __init__(self, path=FLIGHT_HISTORY_DB):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def append(self, user_id: str, booking_id: str, record: FlightRecord) -> bool:
+        """Adds a booking; False if this booking_id was already recorded."""
+        values = record.model_dump()
+        # Never NULL, so the (user_id, date, id) index can serve ORDER BY and the cursor
+        values["date"] = values["date"] or ""
+        with self._lock:
+            cursor = self._conn.execute(
+                f"INSERT OR IGNORE INTO flights (booking_id, user_id, {', '.join(COLUMNS)}, created_at) "
+                f"VALUES (?, ?, {', '.join('?' for _ in COLUMNS)}, ?)",
+                (booking_id, user_id, *(values[c] for c in COLUMNS), time.time()),
+            )
+        return cursor.rowcount == 1
+
+    def history(self, user_id: str, limit: int = HISTORY_PAGE_SIZE, cursor: Optional[str] = None, destination: Optional[str] = None):
+        """
+        One page of a user's flights, newest date first.
+
+        Returns (records, next_cursor); pass next_cursor back to get the
+        following page (None when there are no more).
+        """
+        where, params = ["user_id = ?"], [user_id]
+        if destination:
+            where.append("destination = ?")
+            params.append(destination)
+        if cursor:
+            date, row_id = cursor.rsplit("|", 1)
+            where.append("(date, id) < (?, ?)")
+            params += [date, int(row_id)]
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, {', '.join(COLUMNS)} FROM flights WHERE {' AND '.join(where)} "
+                f"ORDER BY date DESC, id DESC LIMIT ?",
+                (*params, limit + 1),
+            ).fetchall()
+
+        page = rows[:limit]
+        next_cursor = f"{page[-1]['date']}|{page[-1]['id']}" if len(rows) > limit else None
+        return [FlightRecord(**{c: row[c] or None for c in COLUMNS}) for row in page], next_cursor
+
+
+history_store = FlightHistoryStore()
+
+
+def format_history(records, has_more: bool = False) -> str:
+    if not records:
+        return "No past flight history found."
+    table = tabulate(
+        [[i + 1, r.date, r.origin, r.destination, r.airline, r.passenger_name] for i, r in enumerate(records)],
+        headers=["#", "Date", "From", "Destination", "Flight", "Passenger"],
+        tablefmt="pretty",
+    )
+    if has_more:
+        table += f"\nShowing your {len(records)} most recent flights."
+    return table
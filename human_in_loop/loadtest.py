@@ -0,0 +1,203 @@
+import os
+import sys
+import json
+import time
+import socket
+import random
+import asyncio
+import argparse
+import threading
+import subprocess
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from client import MCPSessionManager
+
+# -----------------------------
+# Load test for weathertool_mcp.py.
+# Starts a stub OpenWeather API and the MCP server (pointed at the stub), then
+# drives get_weather from N concurrent MCP sessions and reports throughput,
+# latency percentiles and error rate.
+# python loadtest.py --concurrency 20 --duration 30 --cities 10
+# python loadtest.py --url http://host:8000/mcp   (existing server, no stubs)
+# -----------------------------
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+# -----------------------------
+# Stub OpenWeather forecast API
+# -----------------------------
+class StubForecastHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    hits = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            type(self).hits += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        city = parse_qs(urlparse(self.path).query).get("q", ["?"])[0]
+        now = int(time.time())
+        body = json.dumps({
+            "city": {"name": city},
+            "list": [
+                {"dt": now + hours * 3600, "weather": [{"description": "scattered clouds"}], "main": {"temp": 18 + hours % 7}}
+                for hours in range(0, 120, 3)
+            ],
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub(latency_ms):
+    StubForecastHandler.latency = latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubForecastHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"MCP server did not start on port {port}")
+
+
+def start_mcp_server(stub_url, port, ttl):
+    env = os.environ | {
+        "OPENWEATHER_BASE_URL": stub_url,
+        "OPENWEATHER_API_KEY": "stub",
+        "MCP_HOST": "127.0.0.1",
+        "MCP_PORT": str(port),
+        "FORECAST_TTL_SECONDS": str(ttl),
+    }
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "weathertool_mcp.py")],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    wait_for_port(port)
+    return proc
+
+
+# -----------------------------
+# Load generation
+# -----------------------------
+SESSION_RETRY_SECONDS = 0.5
+
+
+async def virtual_user(url, cities, deadline, remaining, results):
+    """
+    One client with its own MCP session, calling get_weather back to back.
+    A session that fails to open (or breaks) counts as one error, and the
+    user opens a new one after a short pause until the run is over.
+    """
+    while time.monotonic() < deadline and remaining[0] > 0:
+        start = time.perf_counter()
+        try:
+            async with MCPSessionManager(url=url, max_concurrency=1) as manager:
+                await manager.get_tools()
+                while time.monotonic() < deadline and remaining[0] > 0:
+                    remaining[0] -= 1
+                    args = {
+                        "city": random.choice(cities),
+                        "date": (date.today() + timedelta(days=random.randint(0, 4))).isoformat(),
+                    }
+                    start = time.perf_counter()
+                    try:
+                        result = await manager.call("get_weather", args)
+                        ok = "Error" not in str(result)
+                    except Exception:
+                        ok = False
+                    results.append((time.perf_counter() - start, ok))
+        except Exception as e:
+            remaining[0] -= 1
+            results.append((time.perf_counter() - start, False))
+            print(f"⚠️ MCP session failed: {e!r}")
+            await asyncio.sleep(SESSION_RETRY_SECONDS)
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_load(url, concurrency, duration, requests, cities):
+    results = []
+    remaining = [requests or float("inf")]
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*[
+        virtual_user(url, cities, time.monotonic() + duration, remaining, results)
+        for _ in range(concurrency)
+    ], return_exceptions=True)
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            print(f"⚠️ Virtual user stopped: {outcome!r}")
+    return results, time.perf_counter() - start
+
+
+def report(results, wall, concurrency, upstream_hits=None):
+    latencies = sorted(seconds * 1000 for seconds, _ in results)
+    errors = sum(1 for _, ok in results if not ok)
+    total = len(results)
+
+    print(f"\n📊 {datetime.now():%Y-%m-%d %H:%M:%S}  concurrency={concurrency}")
+    print(f"requests     {total}")
+    print(f"throughput   {total / wall:.1f} req/s")
+    print(f"latency ms   p50 {percentile(latencies, 50):.1f}  p90 {percentile(latencies, 90):.1f}  "
+          f"p99 {percentile(latencies, 99):.1f}  max {latencies[-1] if latencies else 0:.1f}")
+    print(f"errors       {errors} ({(errors / total * 100) if total else 0:.2f}%)")
+    if upstream_hits is not None:
+        print(f"upstream     {upstream_hits} OpenWeather calls")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the MCP weather server.")
+    parser.add_argument("--url", default=None, help="Existing MCP endpoint; omit to start stub + server locally")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent MCP sessions")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds to run")
+    parser.add_argument("--requests", type=int, default=0, help="Stop after this many calls (0: duration only)")
+    parser.add_argument("--cities", type=int, default=10, help="Distinct cities to spread calls over")
+    parser.add_argument("--stub-latency-ms", type=float, default=150, help="Simulated OpenWeather latency")
+    parser.add_argument("--ttl", type=int, default=1800, help="FORECAST_TTL_SECONDS for the server under test")
+    args = parser.parse_args()
+
+    cities = [f"City{i}" for i in range(args.cities)]
+    stub = proc = None
+    url = args.url
+    try:
+        if url is None:
+            stub = start_stub(args.stub_latency_ms)
+            port = free_port()
+            proc = start_mcp_server(f"http://127.0.0.1:{stub.server_port}/data/2.5/forecast", port, args.ttl)
+            url = f"http://127.0.0.1:{port}/mcp"
+            print(f"🚀 stub OpenWeather on :{stub.server_port}, MCP server on :{port}")
+
+        results, wall = asyncio.run(run_load(url, args.concurrency, args.duration, args.requests, cities))
+        report(results, wall, args.concurrency, StubForecastHandler.hits if stub else None)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=10)
+        if stub:
+            stub.shutdown()
@@ -10,13 +10,74 @@ load_dotenv(override=True)
 os.environ["LANGCHAIN_PROJECT"] = "Ticket Booking"
 
 import requests
+import threading
+import time
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+
+# -----------------------------
+# Forecasts barely change within the hour: the 5-day forecast for a city is
+# cached (indexed by date) for FORECAST_TTL_SECONDS and fetched over one
+# pooled session, so repeat bookings for the same city cost no network calls.
+# -----------------------------
+FORECAST_TTL_SECONDS = int(os.getenv("FORECAST_TTL_SECONDS", "1800"))
+
+
+def index_by_date(forecast: dict) -> dict:
+    """OpenWeather forecast JSON -> {date: first forecast slot of that day}."""
+    by_date = {}
+    for entry in forecast["list"]:
+        by_date.setdefault(datetime.fromtimestamp(entry["dt"]).date(), entry)
+    return by_date
+
+
+def format_weather(city: str, date: str, by_date: dict) -> str:
+    entry = by_date.get(datetime.strptime(date, "%Y-%m-%d").date())
+    if entry:
+        desc = entry["weather"][0]["description"].capitalize()
+        temp = entry["main"]["temp"]
+        return f"Weather in {city} on {date}: {desc}, {temp}°C"
+    return f"No forecast available for {date}. Try another date within 5 days."
+
+
+def _make_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=2)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
 
 class WeatherTool:
+    # Shared by every instance: one connection pool and one forecast cache
+    _session = _make_session()
+    _cache = {}  # city -> (expires_at, {date: entry})
+    _lock = threading.Lock()
+
     def __init__(self):
         self.api_key = os.getenv("OPENWEATHER_API_KEY")
         self.base_url = "https://api.openweathermap.org/data/2.5/forecast"
 
+    def get_forecast(self, city: str) -> dict:
+        """Forecast entries for a city keyed by date (first slot of each day), cached with a TTL."""
+        key = city.strip().casefold()
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        response = self._session.get(
+            self.base_url,
+            params={"q": city, "appid": self.api_key, "units": "metric"},
+            timeout=10,
+        )
+        response.raise_for_status()
+        by_date = index_by_date(response.json())
+
+        with self._lock:
+            self._cache[key] = (time.monotonic() + FORECAST_TTL_SECONDS, by_date)
+        return by_date
+
     def get_weather(self, city: str, date: str) -> str:
         """
         Fetch weather forecast for a given city and date (within 8-day range).
@@ -25,40 +86,19 @@ class WeatherTool:
         :return: Weather description with temperature or error message
         """
         try:
-            response = requests.get(
-                self.base_url,
-                params={"q": city, "appid": self.api_key, "units": "metric"}
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            # Convert input date to datetime for comparison
-            target_date = datetime.strptime(date, "%Y-%m-%d").date()
-
-            # Check forecast list
-            for entry in data["list"]:
-                forecast_time = datetime.fromtimestamp(entry["dt"])
-                if forecast_time.date() == target_date:
-                    desc = entry["weather"][0]["description"].capitalize()
-                    temp = entry["main"]["temp"]
-                    return f"Weather in {city} on {date}: {desc}, {temp}°C"
-
-            return f"No forecast available for {date}. Try another date within 5 days."
+            return format_weather(city, date, self.get_forecast(city))
 
         except Exception as e:
             return f"Error fetching weather: {str(e)}"
 
-from langchain_groq import ChatGroq
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_registry import get_llm
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage, SystemMessage
 
 
-def get_weather_suggestion(weatherinfo: str):
-    
-    weather_info= weatherinfo
-    # LLM for suggestion
-    llm = ChatGroq(model="llama-3.1-8b-instant", temperature=0.0)
-
+def weather_suggestion_messages(weather_info: str):
     system_message = SystemMessage(
     content=(
         "You are a reliable flight booking assistant. "
@@ -84,8 +124,14 @@ def get_weather_suggestion(weatherinfo: str):
     system_message,
     human_message
     ]
-    
-    response = llm.invoke(messages)
+    return messages
+
+
+def get_weather_suggestion(weatherinfo: str):
+    # LLM for suggestion (shared client from the registry)
+    llm = get_llm("llama-3.1-8b-instant", temperature=0.0)
+
+    response = llm.invoke(weather_suggestion_messages(weatherinfo))
     return response.content
 
 from langgraph.graph import StateGraph, START, END
@@ -150,191 +196,134 @@ def get_details( flight: FlightState):
 
 
 from langchain_core.output_parsers import StrOutputParser
-llm = ChatGroq(model="gemma2-9b-it")
+llm = get_llm("gemma2-9b-it", temperature=0.7)
 from langchain_core.prompts import PromptTemplate
 from langchain_core.runnables import RunnablePassthrough
-def final_llm_response(state: FlightState):
-    user_conf = state.user_confirmation.strip().lower()
-
-    if user_conf:
-        prompt = f"""
-You are a helpful flight ticket booking assistant.
-
-User reply: {{user_conf}}
-
-If the user replies "Yes":
-- First, greet the passenger with a welcome message to their airline. Example: 
-  "Welcome aboard {state.flight_name} Airlines! We're excited to serve you."
-- Then, generate a dummy flight ticket in a clean and professional ticket format like this:
-
---------------------------------------------------
+from concurrent.futures import ThreadPoolExecutor
+
+# -----------------------------
+# The ticket is rendered locally from state; the LLM only writes an optional
+# personalised greeting. It is off by default: with it on, the booking waits
+# for an extra LLM round trip (up to GREETING_TIMEOUT_SECONDS).
+# -----------------------------
+TICKET_TEMPLATE = """--------------------------------------------------
                 ✈ Flight Ticket ✈
 --------------------------------------------------
- Passenger Name : {state.passenger_name}
- Age            : {state.Age}
- Gender         : {state.Gender}
- Contact Number : {state.contact_number}
+ Passenger Name : {passenger_name}
+ Age            : {Age}
+ Gender         : {Gender}
+ Contact Number : {contact_number}
 --------------------------------------------------
- Airline        : {state.flight_name}
- Departure      : {state.departure}
- From           : {state.City}
- To             : {state.destination}
- Date           : {state.Date}
- Seat Preference: {state.seat_preference}
+ Airline        : {flight_name}
+ Departure      : {departure}
+ From           : {City}
+ To             : {destination}
+ Date           : {Date}
+ Seat Preference: {seat_preference}
 --------------------------------------------------
    Wishing you a safe and pleasant journey! ✈
---------------------------------------------------
+--------------------------------------------------"""
 
-If the user replies "No":
-Respond politely with: 
-"Thank you for using! See you again."
-"""
+REJECTION_MESSAGE = "Thank you for using! See you again."
 
-    
-    # Call LLM
-    result = llm.invoke(prompt)
+LLM_GREETING = os.getenv("FLIGHT_LLM_GREETING", "0") == "1"
+GREETING_TIMEOUT_SECONDS = float(os.getenv("GREETING_TIMEOUT_SECONDS", "3"))
+_greeting_pool = ThreadPoolExecutor(max_workers=4)
 
-    # force string
-    state.llm_output = str(result)  
 
-    # OR, if result has .content (LLM message object)
-    state.llm_output = result.content if hasattr(result, "content") else str(result)
+def is_confirmed(state: FlightState) -> bool:
+    return (state.user_confirmation or "").strip().lower() == "yes"
 
-    return state
 
-from langchain_core.messages import SystemMessage
-from langchain_core.runnables import RunnableConfig
-from langchain_core.messages import SystemMessage, HumanMessage
-from langgraph.store.base import BaseStore
+def render_ticket(state: FlightState) -> str:
+    return TICKET_TEMPLATE.format(**state.model_dump())
 
-from trustcall import create_extractor
-from pydantic import BaseModel, Field
-from langchain_groq import ChatGroq
-from typing import List
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.store.memory import InMemoryStore
 
-across_thread_memory = InMemoryStore()
-within_thread_memory = MemorySaver()
-
-class FlightRecord(BaseModel):
-    date: str = Field(description="Flight date in YYYY-MM-DD format")
-    airline: str = Field(description="Airline name")
-    origin: str = Field(description="Departure city")
-    destination: str = Field(description="Arrival city")
-    seat: str = Field(description="Seat preference")
-    departure_time: str = Field(description="Scheduled departure time")
-    summary: str = Field(description="Concise human-readable ticket summary")
-
-class UserProfile(BaseModel):
-    user_name: str = Field(description="The user's preferred name")
-    flight_history: List[FlightRecord] = Field(
-        default_factory=list,
-        description="List of all past flight tickets with structured details"
-    )
+def default_greeting(state: FlightState) -> str:
+    return f"Welcome aboard {state.flight_name} Airlines! We're excited to serve you."
 
-# Initialize base LLM
-model =  ChatGroq(model="llama-3.1-8b-instant", temperature= 0.0)
 
-# TrustCall extractor
-trustcall_extractor = create_extractor(
-    model,
-    tools=[UserProfile],
-    tool_choice="UserProfile"
-)
+def greeting_messages(state: FlightState):
+    return [
+        SystemMessage(content=(
+            "You are a friendly flight booking assistant. "
+            "Write a warm, personalised welcome for the passenger in at most 2 sentences. "
+            "Do not repeat ticket details."
+        )),
+        HumanMessage(content=(
+            f"Passenger: {state.passenger_name}. Airline: {state.flight_name}. "
+            f"Flying from {state.City} to {state.destination} on {state.Date}."
+        )),
+    ]
 
-MODEL_SYSTEM_MESSAGE = """You are a flight booking assistant with memory that provides information about the user. 
-If you have memory for this user, use it to personalize responses (e.g., greet them by name, recall seat preference, or reference past flights). 
-Here is the memory (it may be empty): {memory}"""
 
-TRUSTCALL_INSTRUCTION = """Create or update the user profile memory (JSON doc) to incorporate information from the following conversation.
-The memory should follow this schema:
-- user_name: The user's preferred name
-- flight_history: A list of FlightRecord objects, where each record contains:
-  (date, airline, origin, destination, seat, departure_time, summary)
+def report_ticket_latency(render_ms: float, greeting_ms: Optional[float]):
+    """Log what the final node actually cost; the greeting wait is the only LLM time left in it."""
+    if greeting_ms is None:
+        print(f"🎫 Ticket ready in {render_ms:.2f} ms (no LLM call on the booking path)")
+    else:
+        print(
+            f"🎫 Ticket ready in {greeting_ms:.0f} ms: rendering took {render_ms:.2f} ms, "
+            f"waiting on the LLM greeting added {greeting_ms - render_ms:.0f} ms"
+        )
 
-Rules:
-- Always preserve existing memory.
-- If a new flight is mentioned, append it to flight_history as a new record.
-- If a flight with the same date already exists, update its details instead of duplicating.
-- Keep all data consistent and structured."""
 
+def final_llm_response(state: FlightState):
+    if not is_confirmed(state):
+        return {"llm_output": REJECTION_MESSAGE}
 
+    start = time.perf_counter()
+    greeting_future = _greeting_pool.submit(llm.invoke, greeting_messages(state)) if LLM_GREETING else None
 
-def write_memory(state: FlightState, config: RunnableConfig, store: BaseStore):
-    """Reflect on the booking conversation and save memory to the store."""
+    ticket = render_ticket(state)
+    render_ms = (time.perf_counter() - start) * 1000
 
-    # Get user id from config
-    user_id = config["configurable"]["user_id"]
+    greeting, greeting_ms = default_greeting(state), None
+    if greeting_future:
+        try:
+            greeting = greeting_future.result(timeout=GREETING_TIMEOUT_SECONDS).content
+        except Exception as e:
+            print(f"⚠️ Using default greeting: {str(e) or 'timed out'}")
+        greeting_ms = (time.perf_counter() - start) * 1000
 
-    # Load existing memory
-    namespace = ("memory", user_id)
-    existing_memory = store.get(namespace, "flight_history")
+    report_ticket_latency(render_ms, greeting_ms)
+    return {"llm_output": f"{greeting}\n\n{ticket}"}
 
-    # Prepare existing profile if any
-    existing_profile = {"UserProfile": existing_memory.value} if existing_memory else None
+from langchain_core.messages import SystemMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.messages import SystemMessage, HumanMessage
 
-    # Invoke the extractor
-    result = trustcall_extractor.invoke(
-        {"messages": [SystemMessage(content=TRUSTCALL_INSTRUCTION)]+state["messages"], "existing": existing_profile})
-    
-    # Convert response into dict (JSON-like)
-    updated_profile = result.responses[0].model_dump()
+import sqlite3
+import uuid
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.store.memory import InMemoryStore
 
-    # Save updated profile back to store
-    key = "flight_history"
-    store.put(namespace, key, updated_profile)
+# Checkpoints live in SQLite so a booking waiting on human confirmation
+# survives restarts and can be resumed from any process by thread_id.
+CHECKPOINT_DB = os.getenv("FLIGHT_CHECKPOINT_DB", "flight_checkpoints.db")
 
-    return state
+across_thread_memory = InMemoryStore()
+within_thread_memory = SqliteSaver(sqlite3.connect(CHECKPOINT_DB, check_same_thread=False))
 
-from tabulate import tabulate
+from flight_history import HISTORY_PAGE_SIZE, format_history, history_store, record_from_state
 
-def call_memory(state: FlightState, config: RunnableConfig, store: BaseStore):
-    """Load flight booking history from memory and return it as formatted output."""
 
-    # Get user ID
-    user_id = config["configurable"]["user_id"]
+def write_memory(state: FlightState, config: RunnableConfig):
+    """Append the confirmed booking to the user's flight history (no LLM, no re-read)."""
+    if not is_confirmed(state):
+        return {}
 
-    # Retrieve memory
-    namespace = ("memory", user_id)
-    existing_memory = store.get(namespace, "flight_history")
-
-    if existing_memory and existing_memory.value:
-        memory_value = existing_memory.value
-
-        # Ensure we have a list of dicts
-        if isinstance(memory_value, dict):
-            history_list = [memory_value]  # wrap single dict in a list
-        elif isinstance(memory_value, list):
-            history_list = memory_value
-        else:
-            history_list = []
-
-        # Generate table
-        table_data = [
-            [i+1,
-            entry.get("Date", "Unknown"),
-            entry.get("destination", "Unknown"),
-            entry.get("flight_name", "Unknown"),
-            entry.get("passenger_name", "Unknown")]
-            for i, entry in enumerate(history_list)
-        ]
-        headers = ["#", "Date", "Destination", "Flight", "Passenger"]
-        formatted_history = tabulate(table_data, headers=headers, tablefmt="pretty")
-    else:
-        formatted_history = "No past flight history found."
+    configurable = config["configurable"]
+    history_store.append(configurable["user_id"], configurable["thread_id"], record_from_state(state))
+    return {}
 
-    # Format the memory in the system prompt
-    system_msg = MODEL_SYSTEM_MESSAGE.format(memory=formatted_history)
 
-    # Respond using memory as well as the chat history
-    response = llm.invoke([SystemMessage(content=system_msg)]+state.llm_output)
-    
-    return {"Chat_history": response}
-    # 🔹 Print directly in proper format
-    # print(state.Chat_history)
+def call_memory(state: FlightState, config: RunnableConfig):
+    """Most recent page of the user's flight history, formatted as a table."""
+    user_id = config["configurable"]["user_id"]
 
-    # return state
+    records, next_cursor = history_store.history(user_id, limit=HISTORY_PAGE_SIZE)
+    return {"Chat_history": format_history(records, has_more=next_cursor is not None)}
 
 def Weather_prediction(state: FlightState):
     date=state.Date 
@@ -349,64 +338,110 @@ def Suggetion(state: FlightState):
     state.safety_advice= get_weather_suggestion(weather_info)
     return state
 
-from langgraph.checkpoint.memory import MemorySaver
-
-def history_condition(state):
-    user_input = input("\n🤔 Do you want to see your flight history? (yes/no) ")
-    if user_input.lower() == "yes":
-        return "call_memory"
+def history_question(state: FlightState)->Command[Literal["call_memory", "__end__"]]:
+    # Interrupt instead of input(): the run parks in the checkpointer until resumed
+    user_input = interrupt({"question": "Do you want to see your flight history? (yes/no)"})
+    if str(user_input).strip().lower() == "yes":
+        return Command(goto="call_memory")
     else:
-        return "end"
+        return Command(goto=END)
 
 
-graph = StateGraph(FlightState)
+NODES = {
+    "Weather_prediction": Weather_prediction,
+    "Suggetion": Suggetion,
+    "Human_confirmation": Human_confirmation,
+    "final_confirmation": final_llm_response,
+    "get_details": get_details,
+    "write_memory": write_memory,
+    "call_memory": call_memory,
+    "history_question": history_question,
+}
 
-graph.add_node("Weather_prediction",Weather_prediction)
-graph.add_node("Suggetion",Suggetion)
-graph.add_node("Human_confirmation", Human_confirmation)
-graph.add_node("final_confirmation",final_llm_response )
-graph.add_node("get_details", get_details)
-graph.add_node("write_memory", write_memory)
-graph.add_node("call_memory", call_memory)
 
+def build_graph(overrides=None):
+    """Wire the booking graph; overrides swaps node functions (e.g. async variants) by name."""
+    graph = StateGraph(FlightState)
+    for name, node in {**NODES, **(overrides or {})}.items():
+        graph.add_node(name, node)
 
+    graph.add_edge(START, "Weather_prediction")
+    graph.add_edge("Weather_prediction", "Suggetion")
+    graph.add_edge("Suggetion", "Human_confirmation")
+    graph.add_edge("Human_confirmation", "get_details")
+    graph.add_edge("get_details","final_confirmation")
+    graph.add_edge("final_confirmation","write_memory")
+    graph.add_edge("write_memory", "history_question")
+    return graph
 
-graph.add_edge(START, "Weather_prediction")
-graph.add_edge("Weather_prediction", "Suggetion")
-graph.add_edge("Suggetion", "Human_confirmation")
-graph.add_edge("Human_confirmation", "get_details")
-graph.add_edge("get_details","final_confirmation")
-graph.add_edge("final_confirmation","write_memory")
 
-graph.add_conditional_edges(
-    "write_memory",
-    history_condition,   # function returning node name
-    {
-        "call_memory": "call_memory",
-        "end": END,
-    },
-)
+graph = build_graph()
 
-memory_store = MemorySaver()
 graph_final = graph.compile(
     checkpointer=within_thread_memory,
     store=across_thread_memory
 )
 
-for event in graph_final.stream(
-    {"City": "Bangalore", "Date": "2025-08-27"},
-    config={"configurable": {"thread_id": "1", "user_id": "user1"}},
-    stream_mode= "updates"
-    ):
-    print(event)
-    print("\n")
-
-# Continue the graph execution
-for event in graph_final.stream(
-    Command(resume="yes"),
-    config={"configurable": {"thread_id": "1", "user_id": "user1"}},
-    stream_mode="updates",
-):
-    print(event)
-    print("\n")
+# -----------------------------
+# Resumable booking API: each call runs the graph until it finishes or hits
+# an interrupt, then returns. Nothing blocks while a booking waits on the user.
+# -----------------------------
+def snapshot_status(thread_id: str, snapshot) -> dict:
+    """API view of a checkpointed run: not_found / waiting / incomplete / done."""
+    if not snapshot.created_at:
+        return {"thread_id": thread_id, "status": "not_found"}
+    if snapshot.interrupts:
+        return {
+            "thread_id": thread_id,
+            "status": "waiting",
+            "question": snapshot.interrupts[0].value.get("question"),
+            "safety_advice": snapshot.values.get("safety_advice"),
+        }
+    if snapshot.next:
+        # Stopped without an interrupt (a node failed): resume_booking retries from here
+        return {"thread_id": thread_id, "status": "incomplete", "next": list(snapshot.next)}
+    return {
+        "thread_id": thread_id,
+        "status": "done",
+        "ticket": snapshot.values.get("llm_output"),
+        "history": snapshot.values.get("Chat_history"),
+    }
+
+
+def booking_status(thread_id: str) -> dict:
+    return snapshot_status(thread_id, graph_final.get_state({"configurable": {"thread_id": thread_id}}))
+
+
+def _run(payload, thread_id: str, user_id: str) -> dict:
+    config = {"configurable": {"thread_id": thread_id, "user_id": user_id}}
+    for _ in graph_final.stream(payload, config=config, stream_mode="updates"):
+        pass
+    return booking_status(thread_id)
+
+
+def start_booking(city: str, date: str, user_id: str, thread_id: Optional[str] = None) -> dict:
+    """Start a booking; returns at the first question for the user."""
+    return _run({"City": city, "Date": date}, thread_id or str(uuid.uuid4()), user_id)
+
+
+def resume_booking(thread_id: str, answer: str) -> dict:
+    """Answer the pending question of a booking (the user_id comes from its checkpoint)."""
+    snapshot = graph_final.get_state({"configurable": {"thread_id": thread_id}})
+    if snapshot.interrupts:
+        return _run(Command(resume=answer), thread_id, snapshot.metadata.get("user_id"))
+    if snapshot.next:
+        # An earlier attempt failed mid-run: continue from the last checkpoint
+        return _run(None, thread_id, snapshot.metadata.get("user_id"))
+    return booking_status(thread_id)
+
+
+if __name__ == "__main__":
+    booking = start_booking("Bangalore", "2025-08-27", user_id="user1", thread_id="1")
+    print(booking)
+
+    # Continue the graph execution
+    while booking["status"] == "waiting":
+        answer = input(f"\n🤔 {booking['question']} ")
+        booking = resume_booking(booking["thread_id"], answer)
+        print(booking)
    
\ No newline at end of file
@@ -1,12 +1,79 @@
 import os
+import time
+import asyncio
 import httpx
 from datetime import datetime
 from mcp.server.fastmcp import FastMCP
 from dotenv import load_dotenv
 
-mcp = FastMCP("Weather")
 load_dotenv(override=True)
 
+# -----------------------------
+# Server settings (env overrides let a load test point this at a stub API)
+# -----------------------------
+OPENWEATHER_BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "https://api.openweathermap.org/data/2.5/forecast")
+FORECAST_TTL_SECONDS = int(os.getenv("FORECAST_TTL_SECONDS", "1800"))
+MCP_HOST = os.getenv("MCP_HOST", "127.0.0.1")
+MCP_PORT = int(os.getenv("MCP_PORT", "8000"))
+
+mcp = FastMCP("Weather", host=MCP_HOST, port=MCP_PORT)
+
+# -----------------------------
+# One pooled client for the life of the server, a per-city forecast cache
+# indexed by date, and in-flight fetches shared by concurrent callers.
+# -----------------------------
+_client = None
+_cache = {}     # city -> (expires_at, {date: entry})
+_inflight = {}  # city -> asyncio.Task fetching that city's forecast
+
+
+def get_client():
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+    return _client
+
+
+async def fetch_forecast(city: str, api_key: str) -> dict:
+    response = await get_client().get(
+        OPENWEATHER_BASE_URL,
+        params={"q": city, "appid": api_key, "units": "metric"}
+    )
+    response.raise_for_status()
+
+    # First forecast slot of each day, so lookups by date are a dict get
+    by_date = {}
+    for entry in response.json()["list"]:
+        by_date.setdefault(datetime.fromtimestamp(entry["dt"]).date(), entry)
+    return by_date
+
+
+async def _fetch_and_cache(key: str, city: str, api_key: str) -> dict:
+    try:
+        by_date = await fetch_forecast(city, api_key)
+        _cache[key] = (time.monotonic() + FORECAST_TTL_SECONDS, by_date)
+        return by_date
+    finally:
+        _inflight.pop(key, None)
+
+
+async def get_forecast(city: str, api_key: str) -> dict:
+    key = city.strip().casefold()
+    cached = _cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    # Concurrent requests for the same city wait on a single upstream fetch
+    task = _inflight.get(key)
+    if task is None:
+        task = _inflight[key] = asyncio.ensure_future(_fetch_and_cache(key, city, api_key))
+    # shield: one caller giving up doesn't cancel the fetch for the others
+    return await asyncio.shield(task)
+
+
 @mcp.tool()
 async def get_weather(city: str, date: str) -> str:
     """
@@ -18,29 +85,15 @@ async def get_weather(city: str, date: str) -> str:
         api_key = os.getenv("OPENWEATHER_API_KEY")
         if not api_key:
             return "Error: OPENWEATHER_API_KEY is not set."
-        
-        base_url = "https://api.openweathermap.org/data/2.5/forecast"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                base_url,
-                params={"q": city, "appid": api_key, "units": "metric"}
-            )
-            
-            response.raise_for_status()
-            data = response.json()
-        
+
         # Parse target date
         target_date = datetime.strptime(date, "%Y-%m-%d").date()
 
-        #Look for matching forecast
-        for entry in data["list"]:
-            forecast_time = datetime.fromtimestamp(entry["dt"])
-
-            if forecast_time.date() == target_date:
-                desc = entry["weather"][0]["description"].capitalize()
-                temp = entry["main"]["temp"]
-                return f"Weather in {city} on {date}: {desc}, {temp}°C"
+        entry = (await get_forecast(city, api_key)).get(target_date)
+        if entry:
+            desc = entry["weather"][0]["description"].capitalize()
+            temp = entry["main"]["temp"]
+            return f"Weather in {city} on {date}: {desc}, {temp}°C"
 
         return f"No forecast available for {date}. Try another date within 5 days."
 
@@ -49,4 +102,3 @@ async def get_weather(city: str, date: str) -> str:
 
 if __name__ == "__main__":
     mcp.run(transport="streamable-http")
-   
\ No newline at end of file
@@ -0,0 +1,162 @@
+import os
+import time
+import asyncio
+import weakref
+import threading
+import httpx
+from langchain_groq import ChatGroq
+from langchain_core.callbacks import BaseCallbackHandler
+import warnings
+from dotenv import load_dotenv
+warnings.filterwarnings('ignore')
+load_dotenv(override=True)
+
+# -----------------------------
+# Shared LLM client registry used by every agent in this repo.
+# Clients are built lazily, one per (model, settings), and all of them share
+# one pooled httpx.Client, so keep-alive connections to Groq are reused across
+# modules, nodes and Streamlit sessions. Async connections belong to the loop
+# that opened them, so get_llm() called inside a running loop returns clients
+# built on that loop's own httpx.AsyncClient.
+# -----------------------------
+
+# Per-model settings; anything passed to get_llm() overrides these
+MODEL_CONFIGS = {
+    "openai/gpt-oss-20b": {"temperature": 0, "max_retries": 2, "request_timeout": 60},
+    "gemma2-9b-it": {"temperature": 0, "max_retries": 2, "request_timeout": 60},
+    "llama-3.1-8b-instant": {"temperature": 0, "max_retries": 2, "request_timeout": 30},
+}
+DEFAULT_CONFIG = {"temperature": 0, "max_retries": 2, "request_timeout": 60}
+
+MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "50"))
+
+_lock = threading.Lock()
+_clients = {}
+_http_client = None
+# One async pool, and one set of async-capable chat models, per event loop
+_http_async_clients = weakref.WeakKeyDictionary()
+_loop_clients = weakref.WeakKeyDictionary()
+
+
+def _limits():
+    return httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS // 2)
+
+
+def get_http_client():
+    """Pooled sync HTTP client shared by all chat models."""
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(limits=_limits(), timeout=httpx.Timeout(60.0))
+        return _http_client
+
+
+def _drop_closed_loops():
+    # Pooled connections keep their loop alive, so weak keys alone never expire
+    for cache in (_http_async_clients, _loop_clients):
+        for loop in [loop for loop in cache if loop.is_closed()]:
+            del cache[loop]
+
+
+def get_http_async_client():
+    """Pooled async HTTP client shared by all chat models on the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        _drop_closed_loops()
+        client = _http_async_clients.get(loop)
+        if client is None:
+            client = _http_async_clients[loop] = httpx.AsyncClient(limits=_limits(), timeout=httpx.Timeout(60.0))
+        return client
+
+
+class LLMStats(BaseCallbackHandler):
+    """Per-model call counts, errors, latency and token usage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = {}
+        self.stats = {}
+
+    def _entry(self, model):
+        return self.stats.setdefault(model, {
+            "calls": 0, "errors": 0, "total_latency": 0.0,
+            "input_tokens": 0, "output_tokens": 0,
+        })
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        model = (kwargs.get("invocation_params") or {}).get("model") or (kwargs.get("metadata") or {}).get("ls_model_name")
+        with self._lock:
+            self._started[run_id] = (time.perf_counter(), model or "unknown")
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        started, model = self._started.pop(run_id, (None, "unknown"))
+        usage = {}
+        try:
+            usage = response.generations[0][0].message.usage_metadata or {}
+        except (AttributeError, IndexError):
+            pass
+        with self._lock:
+            entry = self._entry(model)
+            entry["calls"] += 1
+            if started is not None:
+                entry["total_latency"] += time.perf_counter() - started
+            entry["input_tokens"] += usage.get("input_tokens", 0)
+            entry["output_tokens"] += usage.get("output_tokens", 0)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        _, model = self._started.pop(run_id, (None, "unknown"))
+        with self._lock:
+            self._entry(model)["errors"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                model: {**s, "avg_latency": s["total_latency"] / s["calls"] if s["calls"] else 0.0}
+                for model, s in self.stats.items()
+            }
+
+
+llm_stats = LLMStats()
+
+
+def get_llm(model, **overrides):
+    """
+    Return the shared ChatGroq client for a model, building it on first use.
+    Called inside a running event loop, the client is cached for that loop and
+    its ainvoke() uses the loop's own connection pool.
+
+    Args:
+        model: Groq model name, e.g. "gemma2-9b-it".
+        overrides: settings that differ from MODEL_CONFIGS (e.g. temperature=0.3);
+                   each distinct combination gets its own cached client.
+    """
+    config = {**MODEL_CONFIGS.get(model, DEFAULT_CONFIG), **overrides}
+    key = (model, tuple(sorted(config.items())))
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    with _lock:
+        clients = _clients if loop is None else _loop_clients.setdefault(loop, {})
+        client = clients.get(key)
+    if client is None:
+        http_client = get_http_client()
+        # Outside a loop ChatGroq keeps its own async client for the odd ainvoke()
+        async_kwargs = {"http_async_client": get_http_async_client()} if loop is not None else {}
+        with _lock:
+            client = clients.get(key)
+            if client is None:
+                client = clients[key] = ChatGroq(
+                    model=model,
+                    http_client=http_client,
+                    callbacks=[llm_stats],
+                    **async_kwargs,
+                    **config,
+                )
+    return client
+
+
+def get_llm_stats():
+    """Per-model calls / errors / latency / token counters."""
+    return llm_stats.snapshot()